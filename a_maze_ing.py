@@ -4,7 +4,10 @@ import time
 from dataclasses import dataclass
 from typing import Tuple, Optional, List, Dict, Any
 from mazegen.generator import MazeGenerator
+from mazegen.cache import MazeCache
+from mazegen.path import Solution, path_bitmap
 import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 
 @dataclass
@@ -19,11 +22,14 @@ class Config:
     seed: Optional[str] = None
     animation_dig: Optional[bool] = False
     animation_path: Optional[bool] = False
+    algorithm: str = "backtracker"
+    cache_dir: Optional[str] = None
 
 
-def parse_config(file_name: str) -> Config:
+def read_sections(file_name: str) -> Dict[str, Dict[str, str]]:
     """
-    Read config file and return a dict with config.
+    Read config file and return the raw KEY=VALUE pairs of each section.
+    Keys written before any [name] header are stored under ''.
     Handle file error
     """
     if not os.path.isfile(file_name):
@@ -31,7 +37,8 @@ def parse_config(file_name: str) -> Config:
               file=sys.stderr)
         sys.exit(1)
 
-    data: Dict[str, str] = {}
+    sections: Dict[str, Dict[str, str]] = {"": {}}
+    data = sections[""]
 
     try:
         with open(file_name, 'r') as config:
@@ -40,6 +47,16 @@ def parse_config(file_name: str) -> Config:
                 if not line or line.startswith('#'):
                     continue
 
+                if line.startswith("[") and line.endswith("]"):
+                    name = line[1:-1].strip()
+                    if not name or name in sections:
+                        print(f"Error: Bad section name '{line}' in config "
+                              "file.", file=sys.stderr)
+                        sys.exit(1)
+                    sections[name] = {}
+                    data = sections[name]
+                    continue
+
                 if "=" not in line:
                     print(f"Error: Bad format in config file. Line '{line}' "
                           "is invalid.", file=sys.stderr)
@@ -50,104 +67,211 @@ def parse_config(file_name: str) -> Config:
     except Exception as e:
         print(f"Error reading file: {e}")
         sys.exit(1)
-    return convert(data)
+    return sections
+
+
+def parse_config(file_name: str) -> Config:
+    """
+    Read config file and return a single Config.
+    Handle file error
+    """
+    return convert(read_sections(file_name)[""])
 
 
 def convert(data: Dict[str, str]) -> Config:
     """
     Validate raw dictionary data and convert it into a typed Config object.
+    Exit on error.
+    """
+    try:
+        return validate(data)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def validate(data: Dict[str, str]) -> Config:
+    """
+    Validate raw dictionary data and convert it into a typed Config object.
+    Raises ValueError with the reason on error.
     """
     mandatory = ["WIDTH", "HEIGHT", "ENTRY", "EXIT", "PERFECT", "OUTPUT_FILE"]
 
     for key in mandatory:
         if key not in data:
-            print(f"Error : Missing key '{key}' in config file",
-                  file=sys.stderr)
-            sys.exit(1)
+            raise ValueError(f"Missing key '{key}' in config file")
 
     try:
         width = int(data["WIDTH"])
         height = int(data["HEIGHT"])
 
-        if width <= 0 or height <= 0:
-            print("Error: Dimensions (WIDTH, HEIGHT) must be greater than 0.",
-                  file=sys.stderr)
-            sys.exit(1)
-
         entry_parts = data["ENTRY"].split(",")
         if len(entry_parts) != 2:
             raise ValueError
         entry_x = int(entry_parts[0])
         entry_y = int(entry_parts[1])
-        entry = (entry_x, entry_y)
 
         exit_parts = data["EXIT"].split(",")
         if len(exit_parts) != 2:
             raise ValueError
         exit_x = int(exit_parts[0])
         exit_y = int(exit_parts[1])
-        exit_coord = (exit_x, exit_y)
+    except ValueError:
+        raise ValueError("WIDTH and HEIGHT must be integers, ENTRY and EXIT "
+                         "must be 'x,y' coordinates")
+    entry = (entry_x, entry_y)
+    exit_coord = (exit_x, exit_y)
+
+    if width <= 0 or height <= 0:
+        raise ValueError("Dimensions (WIDTH, HEIGHT) must be greater than 0.")
+
+    if (entry_x < 0 or entry_x >= width or
+            entry_y < 0 or entry_y >= height):
+        raise ValueError(f"Entry {entry} is outside the maze boundaries.")
+
+    if (exit_x < 0 or exit_x >= width or
+            exit_y < 0 or exit_y >= height):
+        raise ValueError(f"Exit {exit_coord} is outside the maze boundaries.")
+
+    if entry == exit_coord:
+        raise ValueError("entry and exit cannot be at the same coordinate.")
+
+    raw_perfect = data["PERFECT"].lower()
+    if raw_perfect not in ["true", "false"]:
+        raise ValueError(f"PERFECT must be "
+                         f"'true' or 'false', got '{data['PERFECT']}'")
+    perfect = raw_perfect == "true"
+
+    output_file = data["OUTPUT_FILE"]
+    if not output_file:
+        print("No valid output file provided. Using default_output.txt")
+        output_file = "default_output.txt"
+    seed = data.get("SEED")
+
+    raw_anim_dig = data.get("ANIMATION_DIG")
+    anim_dig_val = False
+    if raw_anim_dig is not None:
+        raw_anim_dig_lower = raw_anim_dig.lower()
+        if raw_anim_dig_lower not in ["true", "false"]:
+            raise ValueError(f"ANIMATION_DIG must be "
+                             f"'true' or 'false', got '{raw_anim_dig}'")
+        anim_dig_val = raw_anim_dig_lower == "true"
+
+    raw_anim_path = data.get("ANIM_PATH")
+    anim_path_val = False
+    if raw_anim_path is not None:
+        raw_anim_path_lower = raw_anim_path.lower()
+        if raw_anim_path_lower not in ["true", "false"]:
+            raise ValueError(f"ANIM_PATH must be "
+                             f"'true' or 'false', got '{raw_anim_path}'")
+        anim_path_val = raw_anim_path_lower == "true"
+
+    algorithm = data.get("ALGORITHM", "backtracker").lower()
+    if algorithm not in ["backtracker", "kruskal"]:
+        raise ValueError(f"ALGORITHM must be 'backtracker' or 'kruskal', "
+                         f"got '{data['ALGORITHM']}'")
+
+    cache_dir = data.get("CACHE_DIR") or None
+
+    return Config(width, height, entry, exit_coord,
+                  perfect, output_file, seed, anim_dig_val,
+                  anim_path_val, algorithm, cache_dir)
+
+
+def validate_sections(sections: Dict[str, Dict[str, str]]
+                      ) -> Tuple[Dict[str, Config], Dict[str, str]]:
+    """
+    Build the Config of every named section on top of the shared
+    defaults. Returns the valid configs and the error of the others.
+    """
+    defaults = sections[""]
+    configs: Dict[str, Config] = {}
+    errors: Dict[str, str] = {}
+    outputs: Dict[str, str] = {}
 
-        if (entry_x < 0 or entry_x >= width or
-                entry_y < 0 or entry_y >= height):
-            print(f"Error: Entry {entry} is outside the maze boundaries.",
-                  file=sys.stderr)
-            sys.exit(1)
+    for name, data in sections.items():
+        if name == "":
+            continue
+        merged = dict(defaults)
+        merged.update(data)
+        try:
+            config = validate(merged)
+        except Exception as e:
+            errors[name] = str(e)
+            continue
 
-        if (exit_x < 0 or exit_x >= width or
-                exit_y < 0 or exit_y >= height):
-            print(f"Error: Exit {exit_coord} is outside the maze boundaries.",
-                  file=sys.stderr)
-            sys.exit(1)
+        output_dir = os.path.dirname(config.output_file) or "."
+        if not os.path.isdir(output_dir):
+            errors[name] = f"Directory '{output_dir}' does not exist."
+            continue
+        # "out.txt" and "./out.txt" are the same file
+        real_path = os.path.realpath(config.output_file)
+        if real_path in outputs:
+            errors[name] = (f"OUTPUT_FILE '{config.output_file}' is already "
+                            f"used by section '{outputs[real_path]}'")
+            continue
+        outputs[real_path] = name
 
-        if entry == exit_coord:
-            print("Error: entry and exit cannot be at the same coordinate.",
-                  file=sys.stderr)
-            sys.exit(1)
+        # Fix the seed now so that every run can be reproduced
+        if config.seed is None:
+            config.seed = str(random.randint(0, 10000000000))
+        configs[name] = config
 
-        raw_perfect = data["PERFECT"].lower()
-        if raw_perfect not in ["true", "false"]:
-            raise ValueError(f"PERFECT must be "
-                             f"'true' or 'false', got '{data['PERFECT']}'")
-        perfect = raw_perfect == "true"
-
-        output_file = data["OUTPUT_FILE"]
-        if not output_file:
-            print("No valid output file provided. Using default_output.txt")
-            output_file = "default_output.txt"
-        seed = data.get("SEED")
-
-        raw_anim_dig = data.get("ANIMATION_DIG")
-        anim_dig_val = False
-        if raw_anim_dig is not None:
-            raw_anim_dig_lower = raw_anim_dig.lower()
-            if raw_anim_dig_lower not in ["true", "false"]:
-                raise ValueError(f"ANIMATION_DIG must be "
-                                 f"'true' or 'false', got '{raw_anim_dig}'")
-            anim_dig_val = raw_anim_dig_lower == "true"
-
-        raw_anim_path = data.get("ANIM_PATH")
-        anim_path_val = False
-        if raw_anim_path is not None:
-            raw_anim_path_lower = raw_anim_path.lower()
-            if raw_anim_path_lower not in ["true", "false"]:
-                raise ValueError(f"ANIM_PATH must be "
-                                 f"'true' or 'false', got '{raw_anim_path}'")
-            anim_path_val = raw_anim_path_lower == "true"
-
-        return Config(width, height, entry, exit_coord,
-                      perfect, output_file, seed, anim_dig_val,
-                      anim_path_val)
+    return configs, errors
 
-    except Exception as e:
-        print(f"Error: {type(e).__name__} - {e}")
-        sys.exit(1)
+
+def build_maze(config: Config) -> int:
+    """
+    Generate, solve and save one maze. Run inside a worker process.
+    Returns the length of the solution.
+    """
+    maze = MazeGenerator(config.width, config.height)
+    path = MazeCache(config.cache_dir).generate(
+        maze, config.entry, config.exit, config.perfect,
+        str(config.seed), config.algorithm)
+    # Not save_maze: a writing error must fail the section
+    with open(config.output_file, "w") as f:
+        f.write(maze.to_text(path, config.entry, config.exit))
+    return len(path)
+
+
+def run_sections(sections: Dict[str, Dict[str, str]],
+                 workers: Optional[int] = None) -> Dict[str, str]:
+    """
+    Validate every section, then build the valid ones across
+    worker processes. Returns the error of each failed section.
+    """
+    configs, errors = validate_sections(sections)
+
+    for name, error in errors.items():
+        print(f"[{name}] Error: {error}", file=sys.stderr)
+
+    if configs:
+        if workers is None:
+            workers = min(len(configs), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            jobs = {pool.submit(build_maze, config): name
+                    for name, config in configs.items()}
+            for job in as_completed(jobs):
+                name = jobs[job]
+                config = configs[name]
+                try:
+                    length = job.result()
+                except Exception as e:
+                    errors[name] = f"{type(e).__name__} - {e}"
+                    print(f"[{name}] Error: {errors[name]}", file=sys.stderr)
+                    continue
+                print(f"[{name}] {config.width}x{config.height}, "
+                      f"seed: {config.seed}, solution: {length} cells "
+                      f"-> {config.output_file}")
+
+    return errors
 
 
 def render_maze(grid: List[List[int]], width: int, height: int,
                 entry: Tuple[int, int], exit: Tuple[int, int],
                 seed_value: str, rotate: bool,
-                path: Optional[List[Tuple[int, int]]] = None) -> None:
+                path: Optional[Solution] = None) -> None:
     """
     Render the maze in the terminal using ASCII characters and ANSI colors.
     """
@@ -183,10 +307,16 @@ def render_maze(grid: List[List[int]], width: int, height: int,
         BLK_EXIT = f"{BG_EXIT}  {RESET}"
         BLK_42 = f"{BG_42}  {RESET}"
 
-    path_set = set(path) if path else set()
+    # One bit per cell, set on the path
+    path_bits = bytearray((width * height + 7) >> 3)
     if path:
-        path_set.add(entry)
-        path_set.add(exit)
+        path_bits = path_bitmap(path, width, height)
+        for x, y in (entry, exit):
+            path_bits[(y * width + x) >> 3] |= 1 << ((y * width + x) & 7)
+
+    def on_path(x: int, y: int) -> bool:
+        cell = y * width + x
+        return (path_bits[cell >> 3] >> (cell & 7)) & 1 == 1
 
     print(f"\nDimensions: {width}x{height}, seed: {seed_value}")
     # Up border
@@ -205,7 +335,7 @@ def render_maze(grid: List[List[int]], width: int, height: int,
                 center_color = BLK_ENTRY
             elif (x, y) == exit:
                 center_color = BLK_EXIT
-            elif (x, y) in path_set:
+            elif on_path(x, y):
                 center_color = BLK_PATH
             elif is_42:
                 center_color = BLK_42
@@ -222,7 +352,7 @@ def render_maze(grid: List[List[int]], width: int, height: int,
                     line_body += BLK_WALL
             else:  # Open wall
                 # If in path green
-                if (x, y) in path_set and (x + 1, y) in path_set:
+                if on_path(x, y) and x + 1 < width and on_path(x + 1, y):
                     line_body += BLK_PATH
                 else:
                     line_body += BLK_EMPTY
@@ -234,7 +364,7 @@ def render_maze(grid: List[List[int]], width: int, height: int,
                 else:
                     line_bottom += BLK_WALL
             else:
-                if (x, y) in path_set and (x, y + 1) in path_set:
+                if on_path(x, y) and y + 1 < height and on_path(x, y + 1):
                     line_bottom += BLK_PATH
                 else:
                     line_bottom += BLK_EMPTY
@@ -248,28 +378,18 @@ def render_maze(grid: List[List[int]], width: int, height: int,
         print(line_bottom)
 
 
-def main() -> None:
-
-    if len(sys.argv) == 2:
-        try:
-            config = parse_config(sys.argv[1])
-        except Exception as e:
-            print(f"An error as occured : {e}")
-            sys.exit(1)
-    else:
-        print("Usage: python3 a_maze_ing.py config.txt")
-        sys.exit(1)
-
-    show_path = True
-    rotate = False
-    if config.seed is not None:
-        seed_value = (config.seed)
-    else:
-        seed_value = str(random.randint(0, 10000000000))
-    random.seed(seed_value)
-    maze = MazeGenerator(config.width, config.height)
+def build(maze: MazeGenerator, config: Config, seed_value: str,
+          rotate: bool, cache: MazeCache) -> Solution:
+    """
+    Generate and solve the maze, with the animations of the config.
+    Without dig animation a known seed is served by the cache.
+    """
+    path: Solution = []
     if (config.animation_dig is True):
+        random.seed(seed_value)
         for _ in maze.generate_maze_steps(config.entry, config.exit,
+                                          config.perfect,
+                                          config.algorithm,
                                           config.perfect):
             render_maze(maze.grid, config.width, config.height,
                         config.entry, config.exit, seed_value,
@@ -277,11 +397,11 @@ def main() -> None:
             print("\033[H\033[J", end="")
             time.sleep(0.01)
     else:
-        maze.generate_maze(config.entry, config.exit, config.perfect)
+        path = cache.generate(maze, config.entry, config.exit,
+                              config.perfect, seed_value, config.algorithm)
 
     print(f"Saving to {config.output_file}...")
     if config.animation_path:
-        path = []
         for step_path in maze.solve_maze_steps(
             config.entry,
             config.exit
@@ -299,11 +419,39 @@ def main() -> None:
             print("\033[H\033[J", end="")
             time.sleep(0.1)
             path = step_path
+    elif (config.animation_dig is True):
+        path = maze.solve_path(config.entry, config.exit)
+        if not path:
+            print("No solution found")
+    return path
+
+
+def main() -> None:
+
+    if len(sys.argv) == 2:
+        try:
+            sections = read_sections(sys.argv[1])
+            # Named sections: build them all, no interactive menu
+            if len(sections) > 1:
+                errors = run_sections(sections)
+                sys.exit(1 if errors else 0)
+            config = convert(sections[""])
+        except Exception as e:
+            print(f"An error as occured : {e}")
+            sys.exit(1)
     else:
-        path = maze.solve_maze(
-            config.entry,
-            config.exit
-        )
+        print("Usage: python3 a_maze_ing.py config.txt")
+        sys.exit(1)
+
+    show_path = True
+    rotate = False
+    if config.seed is not None:
+        seed_value = (config.seed)
+    else:
+        seed_value = str(random.randint(0, 10000000000))
+    maze = MazeGenerator(config.width, config.height)
+    cache = MazeCache(config.cache_dir)
+    path = build(maze, config, seed_value, rotate, cache)
 
     maze.save_maze(config.output_file, path, config.entry, config.exit)
 
@@ -321,8 +469,9 @@ def main() -> None:
         print("4. On/Off Dig animation")
         print("5. On/Off Path animation")
         print("6. Quit")
+        print("7. Re-generate a region")
         try:
-            choice = (input("Choice (1-6): "))
+            choice = (input("Choice (1-7): "))
         except Exception:
             print("Error: invalid input.")
             continue
@@ -339,42 +488,7 @@ def main() -> None:
             else:
                 seed_value = str(random.randint(0, 10000000000))
 
-            random.seed(seed_value)
-            if (config.animation_dig is True):
-                for _ in maze.generate_maze_steps(config.entry, config.exit,
-                                                  config.perfect):
-                    render_maze(maze.grid, config.width, config.height,
-                                config.entry, config.exit, seed_value,
-                                rotate)
-                    print("\033[H\033[J", end="")
-                    time.sleep(0.01)
-            else:
-                maze.generate_maze(config.entry, config.exit, config.perfect)
-            print(f"Saving to {config.output_file}...")
-            if config.animation_path:
-                path = []
-                for step_path in maze.solve_maze_steps(
-                    config.entry,
-                    config.exit
-                ):
-                    render_maze(
-                        maze.grid,
-                        config.width,
-                        config.height,
-                        config.entry,
-                        config.exit,
-                        seed_value,
-                        rotate,
-                        step_path
-                    )
-                    print("\033[H\033[J", end="")
-                    time.sleep(0.1)
-                    path = step_path
-            else:
-                path = maze.solve_maze(
-                    config.entry,
-                    config.exit
-                )
+            path = build(maze, config, seed_value, rotate, cache)
             render_maze(maze.grid, config.width, config.height,
                         config.entry, config.exit, seed_value,
                         rotate, path if show_path else None)
@@ -413,7 +527,36 @@ def main() -> None:
                 config.animation_path = True
             print("\n" * 2)
 
+        if choice == "7":
+            try:
+                region = input("Region x,y,width,height: ")
+                x, y, width, height = [int(v) for v in region.split(",")]
+            except Exception:
+                print("Error: expected 4 integers like 2,3,10,5.")
+                continue
+
+            # Imperfect: same density of openings as break_walls
+            openings = 0 if config.perfect else (width + height) // 10
+            try:
+                maze.regenerate_region(x, y, width, height, config.perfect,
+                                       openings)
+            except ValueError as e:
+                print(f"Error: {e}")
+                continue
+            path = maze.solve_path(config.entry, config.exit)
+            if not path:
+                print("No solution found")
+            render_maze(maze.grid, config.width, config.height,
+                        config.entry, config.exit, seed_value,
+                        rotate, path if show_path else None)
+
+            maze.save_maze(config.output_file, path, config.entry, config.exit)
+
         if choice == "6":
+            stats = cache.stats()
+            print(f"Cache: {stats['memory_hits'] + stats['disk_hits']} hits "
+                  f"({stats['disk_hits']} from disk), "
+                  f"{stats['misses']} misses")
             print("Good Bye!")
             return
 
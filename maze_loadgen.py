@@ -0,0 +1,118 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+async def request(reader: asyncio.StreamReader,
+                  writer: asyncio.StreamWriter,
+                  message: Dict[str, Any]) -> Dict[str, Any]:
+    """Send one request and read its response (and binary body)."""
+    writer.write(json.dumps(message).encode() + b"\n")
+    await writer.drain()
+    header: Dict[str, Any] = json.loads(await reader.readline())
+    if header.get("length"):
+        header["body"] = await reader.readexactly(header["length"])
+    return header
+
+
+async def connect(host: str, port: int, unix: Optional[str]
+                  ) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """Open a connection to the server."""
+    if unix is not None:
+        return await asyncio.open_unix_connection(unix)
+    return await asyncio.open_connection(host, port)
+
+
+async def client(args: argparse.Namespace, number: int,
+                 latencies: List[float], errors: List[str]) -> None:
+    """One connection sending its share of the requests in sequence."""
+    reader, writer = await connect(args.host, args.port, args.unix)
+    try:
+        for i in range(number, args.requests, args.clients):
+            message = {
+                "id": i,
+                "op": args.op,
+                "format": args.format,
+                "config": {
+                    "WIDTH": args.width,
+                    "HEIGHT": args.height,
+                    "ENTRY": [0, 0],
+                    "EXIT": [args.width - 1, args.height - 1],
+                    "PERFECT": args.perfect,
+                    # Few seeds: concurrent duplicates get coalesced
+                    "SEED": i % args.seeds,
+                },
+            }
+            start = time.perf_counter()
+            response = await request(reader, writer, message)
+            latencies.append(time.perf_counter() - start)
+            if not response.get("ok"):
+                errors.append(str(response.get("error")))
+    finally:
+        writer.close()
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Send every request, then print throughput and server stats."""
+    latencies: List[float] = []
+    errors: List[str] = []
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client(args, number, latencies, errors)
+                           for number in range(args.clients)])
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    count = len(latencies)
+    print(f"Requests   : {count} in {elapsed:.2f}s "
+          f"({count / elapsed:.1f} req/s), {len(errors)} errors")
+    if count:
+        print(f"Latency ms : p50 {latencies[count // 2] * 1000:.1f}, "
+              f"p95 {latencies[int(count * 0.95)] * 1000:.1f}, "
+              f"max {latencies[-1] * 1000:.1f}")
+    for error in errors[:5]:
+        print(f"Error: {error}")
+
+    reader, writer = await connect(args.host, args.port, args.unix)
+    try:
+        stats = await request(reader, writer, {"op": "stats"})
+    finally:
+        writer.close()
+    print("Server     :", json.dumps(stats.get("stats")))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="A-Maze-ing load generator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4242)
+    parser.add_argument("--unix", help="Unix socket path instead of TCP")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--seeds", type=int, default=20,
+                        help="Distinct seeds cycled through")
+    parser.add_argument("--width", type=int, default=50)
+    parser.add_argument("--height", type=int, default=50)
+    parser.add_argument("--perfect", choices=["True", "False"],
+                        default="True")
+    parser.add_argument("--op", choices=["generate", "solve"],
+                        default="solve")
+    parser.add_argument("--format", choices=["text", "binary"],
+                        default="text")
+    args = parser.parse_args()
+
+    if args.clients <= 0 or args.requests <= 0 or args.seeds <= 0:
+        print("Error: clients, requests and seeds must be positive.",
+              file=sys.stderr)
+        sys.exit(1)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(e)
+        sys.exit(1)
@@ -0,0 +1,295 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Deque, Dict, Optional, Tuple, Union
+
+from a_maze_ing import Config, validate
+from mazegen.cache import MazeCache
+from mazegen.generator import MazeGenerator
+from mazegen.mazefile import pack_maze
+from mazegen.path import MazePath
+
+# Everything that decides a response
+Key = Tuple[str, str, int, int, Tuple[int, int], Tuple[int, int], bool,
+            str, str]
+
+Payload = Union[str, bytes]
+
+# Largest maze a request may ask for, about 64MB of cells in a worker
+MAX_CELLS = 4000 * 4000
+
+# Cache of each worker process
+_worker_cache: Optional[MazeCache] = None
+
+
+def compute(op: str, fmt: str, config: Config) -> Payload:
+    """
+    Generate (and solve) one maze, run inside a worker process.
+    Returns the maze in the save_maze text format or the binary format.
+    """
+    global _worker_cache
+    # Every request carries the server's --cache-dir
+    if _worker_cache is None:
+        _worker_cache = MazeCache(config.cache_dir)
+
+    maze = MazeGenerator(config.width, config.height)
+    seed = str(config.seed)
+    if op == "solve":
+        path = _worker_cache.generate(maze, config.entry, config.exit,
+                                      config.perfect, seed, config.algorithm)
+    else:
+        random.seed(seed)
+        maze.generate_maze(config.entry, config.exit, config.perfect,
+                           config.algorithm)
+        path = MazePath()
+
+    if fmt == "binary":
+        return pack_maze(maze.width, maze.height, maze.cells, config.entry,
+                         config.exit, path)
+    return maze.to_text(path, config.entry, config.exit)
+
+
+class MazeServer:
+    """
+    JSON-lines maze service.
+    One request per line: {"id": ..., "op": "generate" | "solve" | "stats",
+    "config": {"WIDTH": 20, ...}, "format": "text" | "binary"}.
+    Identical requests running at the same time share one computation.
+    """
+    def __init__(self, workers: Optional[int] = None,
+                 cache_dir: Optional[str] = None,
+                 max_cells: int = MAX_CELLS) -> None:
+        """Create the server and its process pool."""
+        self.workers = workers
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.cache_dir = cache_dir
+        self.max_cells = max_cells
+        self.inflight: Dict[Key, "asyncio.Future[Payload]"] = {}
+
+        self.waiting = 0
+        self.requests = 0
+        self.computed = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.restarts = 0
+        # Latency of the last requests, in seconds
+        self.latencies: Deque[float] = deque(maxlen=10000)
+
+    def parse(self, request: Dict[str, Any]) -> Tuple[Key, Config]:
+        """Validate a request with the config file rules."""
+        op = request.get("op")
+        if op not in ["generate", "solve"]:
+            raise ValueError("op must be 'generate', 'solve' or 'stats'")
+        fmt = request.get("format", "text")
+        if fmt not in ["text", "binary"]:
+            raise ValueError("format must be 'text' or 'binary'")
+
+        raw = request.get("config")
+        if not isinstance(raw, dict):
+            raise ValueError("config must be an object of config keys")
+        data: Dict[str, str] = {}
+        for key, value in raw.items():
+            if isinstance(value, (list, tuple)):
+                value = ",".join(str(v) for v in value)
+            data[str(key).upper()] = str(value)
+        # Clients must not pick where the server writes
+        if "CACHE_DIR" in data:
+            raise ValueError("CACHE_DIR is set by the server (--cache-dir)")
+        # Nothing is written by the server
+        data.setdefault("OUTPUT_FILE", "-")
+
+        config = validate(data)
+        if config.width * config.height > self.max_cells:
+            raise ValueError(f"{config.width}x{config.height} is more than "
+                             f"the {self.max_cells} cells allowed")
+        if config.seed is None:
+            config.seed = str(random.randint(0, 10000000000))
+        config.cache_dir = self.cache_dir
+
+        key = (op, fmt, config.width, config.height, config.entry,
+               config.exit, config.perfect, config.seed, config.algorithm)
+        return key, config
+
+    async def result(self, key: Key, config: Config) -> Payload:
+        """Run the computation, or join the same one already running."""
+        future = self.inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        pool = self.pool
+        future = loop.run_in_executor(pool, compute, key[0], key[1], config)
+        self.inflight[key] = future
+        self.computed += 1
+        try:
+            return await asyncio.shield(future)
+        except BrokenProcessPool:
+            # A worker died (killed, out of memory): every job of this
+            # pool fails, the next requests get a new pool
+            self.restart(pool)
+            raise
+        finally:
+            if future.done():
+                self.forget(key, future)
+            else:
+                # Cancelled caller: clean up once the work ends
+                future.add_done_callback(
+                    lambda done: self.forget(key, done))
+
+    def forget(self, key: Key, future: "asyncio.Future[Payload]") -> None:
+        """Remove a finished computation, unless a newer one replaced it."""
+        if self.inflight.get(key) is future:
+            del self.inflight[key]
+
+    def restart(self, pool: ProcessPoolExecutor) -> None:
+        """Replace a broken pool, once whatever the number of failures."""
+        if pool is not self.pool:
+            return
+        self.restarts += 1
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        pool.shutdown(wait=False, cancel_futures=True)
+        # Every computation in flight ran on the dead pool and can only
+        # fail, new requests must not join them
+        self.inflight.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, counters and latency percentiles."""
+        latencies = sorted(self.latencies)
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1,
+                                 int(p * len(latencies)))]
+
+        return {
+            "queue_depth": len(self.inflight),
+            "waiting": self.waiting,
+            "requests": self.requests,
+            "computed": self.computed,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "restarts": self.restarts,
+            "latency_ms": {
+                "mean": (sum(latencies) / len(latencies) * 1000
+                         if latencies else 0.0),
+                "p50": percentile(0.50) * 1000,
+                "p95": percentile(0.95) * 1000,
+                "p99": percentile(0.99) * 1000,
+                "max": (latencies[-1] * 1000 if latencies else 0.0),
+            },
+        }
+
+    async def answer(self, line: bytes) -> Tuple[Dict[str, Any], bytes]:
+        """Build the response header and binary body of one request."""
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+        except ValueError as e:
+            self.errors += 1
+            return {"ok": False, "error": f"Bad request: {e}"}, b""
+
+        header: Dict[str, Any] = {"id": request.get("id")}
+        if request.get("op") == "stats":
+            header.update(ok=True, stats=self.stats())
+            return header, b""
+
+        self.requests += 1
+        self.waiting += 1
+        start = time.perf_counter()
+        try:
+            key, config = self.parse(request)
+            payload = await self.result(key, config)
+        except Exception as e:
+            self.errors += 1
+            header.update(ok=False, error=f"{type(e).__name__} - {e}")
+            return header, b""
+        finally:
+            self.waiting -= 1
+        self.latencies.append(time.perf_counter() - start)
+
+        header.update(ok=True, seed=config.seed, format=key[1])
+        if isinstance(payload, bytes):
+            header["length"] = len(payload)
+            return header, payload
+        header["maze"] = payload
+        return header, b""
+
+    async def handle(self, reader: asyncio.StreamReader,
+                     writer: asyncio.StreamWriter) -> None:
+        """Serve the requests of one connection, in order."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                header, body = await self.answer(line)
+                writer.write(json.dumps(header).encode() + b"\n" + body)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        self.pool.shutdown(cancel_futures=True)
+
+
+async def serve(server: MazeServer, host: str, port: int,
+                unix: Optional[str]) -> None:
+    """Listen on a TCP port or a Unix socket until interrupted."""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+
+    if unix is not None:
+        listener = await asyncio.start_unix_server(server.handle, unix)
+        print(f"Listening on {unix}")
+    else:
+        listener = await asyncio.start_server(server.handle, host, port)
+        print(f"Listening on {host}:{port}")
+    async with listener:
+        await stop.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="A-Maze-ing service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4242)
+    parser.add_argument("--unix", help="Unix socket path instead of TCP")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache-dir", default=None)
+    parser.add_argument("--max-cells", type=int, default=MAX_CELLS,
+                        help="Largest WIDTH * HEIGHT accepted")
+    args = parser.parse_args()
+
+    server = MazeServer(args.workers, args.cache_dir, args.max_cells)
+    try:
+        asyncio.run(serve(server, args.host, args.port, args.unix))
+        print("Good Bye!")
+    finally:
+        server.close()
+        if args.unix is not None and os.path.exists(args.unix):
+            os.remove(args.unix)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(e)
+        sys.exit(1)
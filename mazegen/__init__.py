@@ -1,3 +1,4 @@
 from .generator import MazeGenerator
+from .mazefile import load_maze, load_region
 
-__all__ = ["MazeGenerator"]
+__all__ = ["MazeGenerator", "load_maze", "load_region"]
@@ -0,0 +1,232 @@
+import sys
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from .generator import (Cells, MazeGenerator, Move, build_borders,
+                        build_moves, closed_sides, flatten_grid)
+from .mazefile import load_maze
+
+
+@dataclass
+class MazeStats:
+    """Topology metrics of a maze"""
+    width: int
+    height: int
+    dead_ends: int
+    junctions: int
+    # degree_counts[d] = number of cells with d open sides
+    degree_counts: List[int]
+    # corridor length (in moves) -> number of corridors
+    corridors: Dict[int, int] = field(default_factory=dict)
+    components: int = 0
+    loops: int = 0
+    solution_length: int = -1
+    diameter: int = 0
+    reachable: int = 0
+    solution_ratio: float = 0.0
+
+
+def _bfs(closed: Cells, moves: List[Tuple[Move, ...]], start: int,
+         dist: "array[int]", queue: "array[int]") -> Tuple[int, int]:
+    """
+    Breadth-First Search on the flat grid.
+    dist must be filled with -1, queue must hold one slot per cell.
+    Returns the farthest cell and the number of reached cells.
+    """
+    dist[start] = 0
+    queue[0] = start
+    head = 0
+    tail = 1
+
+    while head < tail:
+        cell = queue[head]
+        head += 1
+        d = dist[cell] + 1
+
+        for step, _, _ in moves[closed[cell]]:
+            if dist[cell + step] == -1:
+                dist[cell + step] = d
+                queue[tail] = cell + step
+                tail += 1
+
+    # The last dequeued cell is the farthest one
+    return queue[tail - 1], tail
+
+
+def _corridors(closed: Cells, degree: bytes,
+               moves: List[Tuple[Move, ...]]) -> Dict[int, int]:
+    """
+    Measure every corridor, a chain of 2-sided cells between two
+    dead-ends or junctions. Each cell is walked at most once.
+    """
+    seen = bytearray(len(closed))
+    lengths: Dict[int, int] = {}
+
+    for cell in range(len(closed)):
+        if degree[cell] == 2 or degree[cell] == 0:
+            continue
+        for step, _, _ in moves[closed[cell]]:
+            prev = cell
+            curr = cell + step
+            if degree[curr] != 2:
+                # Two nodes side by side, count it from one side only
+                if curr < cell:
+                    continue
+            elif seen[curr]:
+                continue
+            length = 1
+            while degree[curr] == 2:
+                seen[curr] = 1
+                for step2, _, _ in moves[closed[curr]]:
+                    if curr + step2 != prev:
+                        break
+                prev = curr
+                curr += step2
+                length += 1
+            lengths[length] = lengths.get(length, 0) + 1
+
+    # Corridors left are closed rings without any junction
+    for cell in range(len(closed)):
+        if degree[cell] != 2 or seen[cell]:
+            continue
+        prev = -1
+        curr = cell
+        length = 0
+        while not seen[curr]:
+            seen[curr] = 1
+            for step2, _, _ in moves[closed[curr]]:
+                if curr + step2 != prev:
+                    break
+            prev = curr
+            curr += step2
+            length += 1
+        lengths[length] = lengths.get(length, 0) + 1
+
+    return lengths
+
+
+def analyze_grid(grid: List[List[int]], entry: Tuple[int, int],
+                 exit: Tuple[int, int]) -> MazeStats:
+    """
+    Compute the topology metrics of a grid in linear time.
+    """
+    height = len(grid)
+    width = len(grid[0]) if height > 0 else 0
+    closed = closed_sides(flatten_grid(grid), build_borders(width, height))
+    return analyze_cells(closed, width, height, entry, exit)
+
+
+def analyze_cells(closed: Cells, width: int, height: int,
+                  entry: Tuple[int, int],
+                  exit: Tuple[int, int]) -> MazeStats:
+    """
+    Compute the topology metrics of a flat buffer of closed sides
+    (walls and borders) in linear time.
+    """
+    size = width * height
+
+    for x, y in (entry, exit):
+        if x < 0 or x >= width or y < 0 or y >= height:
+            raise ValueError(f"({x}, {y}) is outside the maze boundaries")
+
+    moves = build_moves(width)
+
+    # Open sides of every mask, as a translation table
+    sides = bytes(len(moves[mask & 15]) for mask in range(256))
+    degree = bytes(closed).translate(sides)
+
+    degree_counts = [0, 0, 0, 0, 0]
+    for d in range(5):
+        degree_counts[d] = degree.count(d)
+    edges = sum(d * degree_counts[d] for d in range(5)) // 2
+
+    dist = array("i", [-1]) * size
+    queue = array("I", [0]) * size
+
+    # Connected components, isolated cells (like the 42) included
+    components = 0
+    start = dist.index(-1) if size > 0 else -1
+    while start != -1:
+        _bfs(closed, moves, start, dist, queue)
+        components += 1
+        try:
+            start = dist.index(-1, start)
+        except ValueError:
+            start = -1
+
+    stats = MazeStats(width, height, degree_counts[1],
+                      degree_counts[3] + degree_counts[4], degree_counts,
+                      _corridors(closed, degree, moves), components,
+                      # Cyclomatic number: independent loops in the graph
+                      edges - size + components)
+
+    # First pass, from the entry: solution length and a far cell
+    entry_cell = entry[1] * width + entry[0]
+    exit_cell = exit[1] * width + exit[0]
+    dist = array("i", [-1]) * size
+    far, stats.reachable = _bfs(closed, moves, entry_cell, dist, queue)
+    stats.solution_length = dist[exit_cell]
+
+    # Second pass, from that far cell: the diameter
+    # (exact for perfect mazes, lower bound once loops exist)
+    dist = array("i", [-1]) * size
+    far, _ = _bfs(closed, moves, far, dist, queue)
+    stats.diameter = dist[far]
+
+    if stats.solution_length >= 0:
+        stats.solution_ratio = ((stats.solution_length + 1)
+                                / stats.reachable)
+    return stats
+
+
+def analyze_maze(maze: MazeGenerator, entry: Tuple[int, int],
+                 exit: Tuple[int, int]) -> MazeStats:
+    """Compute the topology metrics of a generated maze."""
+    return analyze_cells(maze.closed_cells(), maze.width, maze.height,
+                         entry, exit)
+
+
+def format_report(stats: MazeStats) -> str:
+    """Format metrics as a human readable report."""
+    lines = [
+        f"Dimensions      : {stats.width}x{stats.height}",
+        f"Dead-ends       : {stats.dead_ends}",
+        f"Junctions       : {stats.junctions}",
+        "Open sides      : " + ", ".join(
+            f"{d}:{stats.degree_counts[d]}" for d in range(5)),
+        f"Components      : {stats.components}",
+        f"Loops           : {stats.loops}",
+        f"Solution length : {stats.solution_length}",
+        f"Diameter        : {stats.diameter}",
+        f"Solution cells  : {stats.solution_ratio:.2%} "
+        f"of {stats.reachable} reachable",
+        "Corridors       : " + ", ".join(
+            f"{length}:{count}"
+            for length, count in sorted(stats.corridors.items())),
+    ]
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """Print a report for every saved maze given on the command line."""
+    if len(sys.argv) < 2:
+        print("Usage: python3 -m mazegen.analytics output_maze.txt ...")
+        sys.exit(1)
+
+    status = 0
+    for filename in sys.argv[1:]:
+        try:
+            grid, entry, exit, _ = load_maze(filename)
+            stats = analyze_grid(grid, entry, exit)
+        except Exception as e:
+            print(f"{filename}: error: {e}", file=sys.stderr)
+            status = 1
+            continue
+        print(f"== {filename} ==")
+        print(format_report(stats))
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
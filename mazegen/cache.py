@@ -0,0 +1,228 @@
+import hashlib
+import os
+import random
+import struct
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple, Union
+
+from .generator import GENERATOR_VERSION, MazeGenerator
+from .path import MazePath
+
+# Magic, width, height, pattern cells, path bytes
+HEADER = struct.Struct("<4sIIII")
+MAGIC = b"MZC2"
+
+# Cells, pattern indices, packed path
+Entry = Tuple[bytes, bytes, bytes]
+
+
+class MazeCache:
+    """
+    Cache of generated and solved mazes, keyed by their parameters.
+    Recent entries are kept in memory, older ones on disk (optional).
+    """
+    def __init__(self, directory: Optional[str] = None,
+                 max_entries: int = 32,
+                 max_bytes: int = 256 * 1024 * 1024,
+                 max_memory_bytes: int = 64 * 1024 * 1024) -> None:
+        """Create the cache, the disk tier is used if a directory is set."""
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_memory_bytes = max_memory_bytes
+        self.entries: "OrderedDict[str, Entry]" = OrderedDict()
+        # Size of the entries kept in memory
+        self.memory_bytes = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(width: int, height: int, entry: Tuple[int, int],
+            exit: Tuple[int, int], perfect: bool, seed: Union[int, str],
+            algorithm: str = "backtracker") -> str:
+        """Hash of everything that decides the maze."""
+        # repr keeps "1" and 1 apart, they don't seed the same maze
+        text = (f"{GENERATOR_VERSION}|{width}|{height}|{entry}|{exit}|"
+                f"{perfect}|{algorithm}|{seed!r}")
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def generate(self, maze: MazeGenerator, entry: Tuple[int, int],
+                 exit: Tuple[int, int], perfect: bool, seed: Union[int, str],
+                 algorithm: str = "backtracker") -> MazePath:
+        """
+        Fill the maze as random.seed(seed) + generate_maze + solve_maze
+        would, and return the solution. Only a miss runs them.
+        """
+        key = self.key(maze.width, maze.height, entry, exit, perfect,
+                       seed, algorithm)
+        found = self.get(key)
+
+        if found is None:
+            self.misses += 1
+            random.seed(seed)
+            # A perfect maze is solved from its spanning tree
+            maze.generate_maze(entry, exit, perfect, algorithm,
+                               record_tree=perfect)
+            path = maze.solve_path(entry, exit)
+            if not path:
+                print("No solution found")
+            self.put(key, maze, path)
+            return path
+
+        cells, pattern, path_data = found
+        maze.load_cells(bytearray(cells))
+        maze.pattern = set()
+        for cell in _indices(pattern):
+            maze.pattern.add((cell % maze.width, cell // maze.width))
+        return MazePath.frombytes(path_data)
+
+    def get(self, key: str) -> Optional[Entry]:
+        """Look for an entry in memory, then on disk."""
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.memory_hits += 1
+            return self.entries[key]
+
+        found = self.read(key)
+        if found is not None:
+            self.disk_hits += 1
+            self.remember(key, found)
+        return found
+
+    def put(self, key: str, maze: MazeGenerator, path: MazePath) -> None:
+        """Store a maze and its solution in both tiers."""
+        pattern = array("I")
+        for x, y in sorted(maze.pattern):
+            pattern.append(y * maze.width + x)
+        found = (bytes(maze.flat_cells()), pattern.tobytes(),
+                 path.tobytes())
+        self.remember(key, found)
+        self.write(key, maze.width, maze.height, found)
+
+    def remember(self, key: str, found: Entry) -> None:
+        """Add an entry to the memory tier, dropping the oldest ones."""
+        if key in self.entries:
+            self.memory_bytes -= _size(self.entries[key])
+        self.entries[key] = found
+        self.entries.move_to_end(key)
+        self.memory_bytes += _size(found)
+        # An entry larger than the limit alone is only kept on disk
+        while self.entries and (len(self.entries) > self.max_entries
+                                or self.memory_bytes
+                                > self.max_memory_bytes):
+            _, dropped = self.entries.popitem(last=False)
+            self.memory_bytes -= _size(dropped)
+
+    def file_name(self, key: str) -> str:
+        """Path of the disk entry of a key."""
+        return os.path.join(str(self.directory), key + ".maze")
+
+    def read(self, key: str) -> Optional[Entry]:
+        """Load a disk entry, a broken file is removed and missed."""
+        if self.directory is None:
+            return None
+        file_name = self.file_name(key)
+        try:
+            with open(file_name, "rb") as f:
+                data = f.read()
+            magic, width, height, n_pattern, n_path = \
+                HEADER.unpack_from(data, 0)
+            start = HEADER.size
+            end = start + width * height + n_pattern * 4 + n_path
+            if magic != MAGIC or len(data) != end:
+                raise ValueError("Broken cache entry")
+        except FileNotFoundError:
+            return None
+        except Exception:
+            _remove(file_name)
+            return None
+
+        # Mark the entry as recently used for eviction, it is still
+        # valid if another process just evicted it
+        try:
+            os.utime(file_name)
+        except OSError:
+            pass
+        cells_end = start + width * height
+        pattern_end = cells_end + n_pattern * 4
+        return (data[start:cells_end], data[cells_end:pattern_end],
+                data[pattern_end:end])
+
+    def write(self, key: str, width: int, height: int,
+              found: Entry) -> None:
+        """Store a disk entry, then evict the least recently used ones."""
+        if self.directory is None:
+            return
+        cells, pattern, path_data = found
+        file_name = self.file_name(key)
+        temp_name = f"{file_name}.{os.getpid()}.tmp"
+        try:
+            with open(temp_name, "wb") as f:
+                f.write(HEADER.pack(MAGIC, width, height,
+                                    len(pattern) // 4, len(path_data)))
+                f.write(cells)
+                f.write(pattern)
+                f.write(path_data)
+            # Readers never see a partial file
+            os.replace(temp_name, file_name)
+        except Exception as e:
+            print(f"Cache writing error : {e}")
+            _remove(temp_name)
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the oldest disk entries above max_bytes."""
+        files: List[Tuple[float, int, str]] = []
+        total = 0
+        for name in os.listdir(str(self.directory)):
+            if not name.endswith(".maze"):
+                continue
+            file_name = os.path.join(str(self.directory), name)
+            try:
+                stat = os.stat(file_name)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, file_name))
+            total += stat.st_size
+
+        files.sort()
+        for _, size, file_name in files:
+            if total <= self.max_bytes:
+                break
+            _remove(file_name)
+            total -= size
+
+    def stats(self) -> Dict[str, int]:
+        """Hit and miss counters."""
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+        }
+
+
+def _size(found: Entry) -> int:
+    """Bytes held by an entry."""
+    return sum(len(part) for part in found)
+
+
+def _indices(data: bytes) -> "array[int]":
+    """Decode flat cell indices stored with array.tobytes."""
+    cells = array("I")
+    cells.frombytes(data)
+    return cells
+
+
+def _remove(file_name: str) -> None:
+    """Delete a file, ignoring a missing one."""
+    try:
+        os.remove(file_name)
+    except OSError:
+        pass
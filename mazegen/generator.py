@@ -1,5 +1,134 @@
 import random
-from typing import List, Tuple, Set, Generator
+from array import array
+from collections import deque
+from typing import Dict, List, Optional, Tuple, Set, Generator, Union
+
+from .kruskal import find, kruskal
+from .mazefile import write_index
+from .path import MazePath, Solution
+
+# Bump when a given seed no longer produces the same maze
+GENERATOR_VERSION = 1
+
+# Wall bit of each side of a cell
+NORTH = 1
+EAST = 2
+SOUTH = 4
+WEST = 8
+
+# Move code (index in "NESW") of a move made through each wall
+WALL_CODES = bytes([0, 0, 1, 0, 2, 0, 0, 0, 3])
+
+# Parent code of a cell outside the spanning tree, and of its root
+NO_PARENT = 255
+ROOT = 4
+
+# Cells a regenerated region may search around it, per cell of the
+# region, to merge its old parts in one tree
+SEARCH_FACTOR = 8
+
+# One move: (flat-index offset, wall of the cell, wall of the neighbor)
+Move = Tuple[int, int, int]
+
+# Flat buffer of one byte per cell, owned or shared
+Cells = Union[bytearray, memoryview]
+
+
+def build_moves(width: int) -> List[Tuple[Move, ...]]:
+    """
+    Precompute the moves allowed by each 4-bit mask of closed sides.
+    Moves are listed North, South, East, West.
+    """
+    sides = ((NORTH, -width, SOUTH), (SOUTH, width, NORTH),
+             (EAST, 1, WEST), (WEST, -1, EAST))
+    moves: List[Tuple[Move, ...]] = []
+    for mask in range(16):
+        moves.append(tuple((offset, wall, back)
+                           for wall, offset, back in sides
+                           if not mask & wall))
+    return moves
+
+
+# Hex digit of each cell value, as written by to_text
+HEX_DIGITS = b"0123456789ABCDEF" + bytes(240)
+
+
+def build_frame(width: int, height: int) -> bytearray:
+    """
+    Visited flags of a maze with a one-cell frame around it, the frame
+    already visited: no move can leave the maze, no border check needed.
+    Cell (x, y) is at index (y + 1) * (width + 2) + x + 1.
+    """
+    # One allocation, then the top and bottom rows of the frame
+    frame = bytearray(b"\x01" + bytes(width) + b"\x01") * (height + 2)
+    edge = b"\x01" * (width + 2)
+    frame[:width + 2] = edge
+    frame[len(frame) - width - 2:] = edge
+    return frame
+
+
+def build_borders(width: int, height: int) -> bytearray:
+    """
+    Closed sides of every cell due to the maze borders, in the same bits
+    as the walls: (walls | border) is the key of the moves table.
+    """
+    row = bytearray(width)
+    if width > 0:
+        row[0] |= WEST
+        row[-1] |= EAST
+    borders = row * height
+    last = (height - 1) * width
+    for x in range(width):
+        borders[x] |= NORTH
+        borders[last + x] |= SOUTH
+    return borders
+
+
+def connected_parts(closed: Cells, blocked: Cells,
+                    moves: List[Tuple[Move, ...]]) -> List[List[int]]:
+    """
+    Cells of each part of a flat maze connected through its open sides,
+    blocked cells left out. Each part starts with its first cell.
+    """
+    seen = bytearray(blocked)
+    parts: List[List[int]] = []
+    for first in range(len(closed)):
+        if seen[first]:
+            continue
+        seen[first] = 1
+        part = [first]
+        for cell in part:
+            for step, _, _ in moves[closed[cell]]:
+                if not seen[cell + step]:
+                    seen[cell + step] = 1
+                    part.append(cell + step)
+        parts.append(part)
+    return parts
+
+
+def part_numbers(parts: List[List[int]], size: int) -> "array[int]":
+    """Number of the part of each cell, from 1, 0 for cells left out."""
+    number = array("I", [0]) * size
+    for count, part in enumerate(parts, 1):
+        for cell in part:
+            number[cell] = count
+    return number
+
+
+def flatten_grid(grid: List[List[int]]) -> bytearray:
+    """Copy a 2D grid into a flat buffer, one byte per cell."""
+    cells = bytearray()
+    for row in grid:
+        cells.extend(row)
+    return cells
+
+
+def closed_sides(cells: Cells, borders: Cells) -> bytearray:
+    """Merge the walls and the borders of every cell in one pass."""
+    size = len(cells)
+    merged = (int.from_bytes(cells, "little")
+              | int.from_bytes(borders, "little"))
+    return bytearray(merged.to_bytes(size, "little"))
 
 
 class MazeGenerator:
@@ -10,23 +139,69 @@ class MazeGenerator:
         """Initialize the maze generator with dimensions and empty grids."""
         self.width = width
         self.height = height
-        self.grid: List[List[int]] = []
-        self.visited: List[List[bool]] = []
-        self.path: List[Tuple[int, int]] = []
+        # Nested rows of the grid property, built on first use
+        self._grid: Optional[List[List[int]]] = None
+        # Flat working buffers, cell (x, y) is at index y * width + x
+        self.cells = bytearray([15]) * (width * height)
+        # One byte per cell, inside a visited frame
+        self.visited = build_frame(width, height)
+        # Backtracker stack: move code (index in "NESW") of each step
+        self.path = bytearray()
         self.pattern: Set[Tuple[int, int]] = set()
+        # Spanning tree of the backtracker, empty when not recorded:
+        # move code from the parent of each cell, and depth of each cell
+        self.tree = bytearray()
+        self.depth = array("I")
 
-        for y in range(height):
-            new_line: List[int] = []
+        # Lookup table for neighbor enumeration
+        self.moves = build_moves(width)
 
-            for x in range(width):
-                new_line.append(15)
-            self.grid.append(new_line)
-
-        for y in range(height):
-            line_visited: List[bool] = []
-            for x in range(width):
-                line_visited.append(False)
-            self.visited.append(line_visited)
+    @property
+    def grid(self) -> List[List[int]]:
+        """
+        The maze as a 2D list of wall masks, grid[y][x].
+        Built from the flat cells the first time it is used, after that
+        the grid is the reference until a method writes the cells: such
+        a method first copies the grid back (sync_cells) and drops it.
+        """
+        if self._grid is None:
+            self._grid = self.rows()
+        return self._grid
+
+    @grid.setter
+    def grid(self, grid: List[List[int]]) -> None:
+        self._grid = grid
+
+    def load_cells(self, cells: bytearray) -> None:
+        """Replace the maze by a flat cell buffer."""
+        self.cells = cells
+        self._grid = None
+        self.forget_tree()
+
+    def flat_cells(self) -> bytearray:
+        """The cells of the maze, copied from the grid if it was built."""
+        if self._grid is None:
+            return self.cells
+        return flatten_grid(self._grid)
+
+    def sync_cells(self) -> None:
+        """Make the cells the reference: copy a built grid and drop it."""
+        if self._grid is not None:
+            self.cells = flatten_grid(self._grid)
+            self._grid = None
+
+    def border(self, x: int, y: int) -> int:
+        """Closed sides of the cell (x, y) due to the maze borders."""
+        sides = 0
+        if y == 0:
+            sides |= NORTH
+        if y == self.height - 1:
+            sides |= SOUTH
+        if x == self.width - 1:
+            sides |= EAST
+        if x == 0:
+            sides |= WEST
+        return sides
 
     def neighbors(self, x: int, y: int) -> List[Tuple[int, int]]:
         """
@@ -35,31 +210,11 @@ class MazeGenerator:
         """
         possible: List[Tuple[int, int]] = []
 
-        # North : (x, y - 1)
-        # South : (x, y + 1)
-        # East : (x + 1, y)
-        # West : (x - 1, y)
-
-        # Check North (y - 1)
-        if y - 1 >= 0:
-            if self.visited[y - 1][x] is False:
-                possible.append((x, y - 1))
-
-        # Check South (y + 1)
-        if y + 1 < self.height:
-            if self.visited[y + 1][x] is False:
-                possible.append((x, y + 1))
-
-        # Check East (x + 1)
-        if x + 1 < self.width:
-            if self.visited[y][x + 1] is False:
-                possible.append((x + 1, y))
-
-        # Check West (x - 1)
-        if x - 1 >= 0:
-            if self.visited[y][x - 1] is False:
-                possible.append((x - 1, y))
-
+        stride = self.width + 2
+        framed = (y + 1) * stride + x + 1
+        for dx, dy in ((0, -1), (0, 1), (1, 0), (-1, 0)):
+            if not self.visited[framed + dy * stride + dx]:
+                possible.append((x + dx, y + dy))
         return possible
 
     def dig_path(self, current_x: int, current_y: int,
@@ -92,127 +247,191 @@ class MazeGenerator:
             self.grid[current_y][current_x] &= ~8  # Break west wall at current
             self.grid[next_y][next_x] &= ~2  # Break east wall at next position
 
-    def generate_maze_steps(
-        self,
-        entry: Tuple[int, int],
-        exit: Tuple[int, int],
-        perfect: bool
-    ) -> Generator[List[List[int]], None, None]:
-        """
-        Generate a maze using the Recursive Backtracker algorithm.
-        With a generator to allow animation during rendering.
-        """
-        # Add the starting point to the visited area
-        self.grid = []
-        for y in range(self.height):
-            new_line = []
-            for x in range(self.width):
-                new_line.append(15)
-            self.grid.append(new_line)
-
-        self.visited = []
-        for y in range(self.height):
-            line_visited = []
-            for x in range(self.width):
-                line_visited.append(False)
-            self.visited.append(line_visited)
-
-        self.path = []
-
+        # A new opening can make a loop
+        self.forget_tree()
+
+    def reset(self, entry: Tuple[int, int], exit: Tuple[int, int]) -> None:
+        """Fill the flat buffers with closed cells and draw the 42."""
+        size = self.width * self.height
+        # Release the previous buffers before the new ones are built
+        self._grid = None
+        self.cells = bytearray()
+        self.visited = bytearray()
+        self.cells = bytearray([15]) * size
+        self.visited = build_frame(self.width, self.height)
+        self.path = bytearray()
+        self.forget_tree()
         self.draw42(entry, exit)
-        start_x, start_y = entry
-        self.visited[start_y][start_x] = True
-        self.path.append((start_x, start_y))
-
-        while len(self.path) > 0:
-            # Get the current pos
-            # [-1] is the lastpositional arg
-            curr_x, curr_y = self.path[-1]
-
-            # Check that we did'nt visited the neighbors already
-            possibles = self.neighbors(curr_x, curr_y)
-
-            # One possibilitie exist at least
-            if len(possibles) > 0:
-                next_x, next_y = random.choice(possibles)
 
-                self.dig_path(curr_x, curr_y, next_x, next_y)
+    def forget_tree(self) -> None:
+        """Drop the spanning tree, the grid no longer matches it."""
+        self.tree = bytearray()
+        self.depth = array("I")
 
-                # Next is now visited
-                self.visited[next_y][next_x] = True
+    def rows(self) -> List[List[int]]:
+        """Build the 2D grid from the flat cell buffer."""
+        cells = self.cells
+        width = self.width
+        return [list(cells[i:i + width])
+                for i in range(0, width * self.height, width)]
 
-                # Add next to the path
-                self.path.append((next_x, next_y))
+    def backtrack(self, entry: Tuple[int, int]) -> Generator[int, None, None]:
+        """
+        Recursive Backtracker on the flat buffers.
+        Yields the index of each newly dug cell.
+        """
+        cells = self.cells
+        visited = self.visited
+        stack = self.path
+        randrange = random.randrange
+        width = self.width
+        stride = width + 2
+
+        # Visited offset, cell offset, wall, wall of the neighbor and
+        # move code: North, South, East, West like the moves table
+        moves = ((-stride, -width, NORTH, SOUTH, 0),
+                 (stride, width, SOUTH, NORTH, 2),
+                 (1, 1, EAST, WEST, 1),
+                 (-1, -1, WEST, EAST, 3))
+        # Offsets of each move code, to go back
+        back_steps = (stride, -1, -stride, 1)
+        back_offsets = (width, -1, -width, 1)
+
+        # Reused for every step, no allocation in the loop
+        candidates = list(moves)
+
+        # Current position, in the visited buffer and in the cells
+        curr = (entry[1] + 1) * stride + entry[0] + 1
+        cell = entry[1] * width + entry[0]
+        visited[curr] = 1
+
+        while True:
+            # Check that we did'nt visited the neighbors already,
+            # the frame is visited so no move leaves the maze
+            count = 0
+            for move in moves:
+                if not visited[curr + move[0]]:
+                    candidates[count] = move
+                    count += 1
 
-                yield self.grid
-            else:
+            # One possibilitie exist at least
+            if count > 0:
+                # One draw, same as random.choice on the candidates
+                step, offset, wall, back, code = \
+                    candidates[randrange(count)]
+
+                cells[cell] &= ~wall
+                cell += offset
+                cells[cell] &= ~back
+
+                # Next is now visited, its move is added to the path
+                curr += step
+                visited[curr] = 1
+                stack.append(code)
+
+                yield cell
+            elif len(stack) > 0:
                 # No possibilities we go back
                 # As the current is visited the loop will choose
                 # another poss
-                self.path.pop()
+                code = stack.pop()
+                curr += back_steps[code]
+                cell += back_offsets[code]
+            else:
+                break
+
+    def tree_steps(self, entry: Tuple[int, int],
+                   steps: Generator[int, None, None]
+                   ) -> Generator[int, None, None]:
+        """
+        Record the spanning tree of the backtracker steps: the move code
+        from the parent of each cell, and its depth.
+        """
+        size = self.width * self.height
+        tree = self.tree = bytearray([NO_PARENT]) * size
+        depth = self.depth = array("I", [0]) * size
+        tree[entry[1] * self.width + entry[0]] = ROOT
+        stack = self.path
+
+        for cell in steps:
+            # The path holds the moves of the whole branch from the entry
+            tree[cell] = stack[-1]
+            depth[cell] = len(stack)
+            yield cell
+
+    def carve(self, entry: Tuple[int, int], perfect: bool,
+              algorithm: str,
+              record_tree: bool = False) -> Generator[int, None, None]:
+        """
+        The steps of the chosen algorithm on the flat buffers.
+        Yields the index of a cell each time one of its walls is broken.
+        Only the backtracker can record its spanning tree.
+        """
+        # Returned, not delegated: no extra generator level per step
+        if algorithm == "backtracker":
+            if record_tree:
+                return self.tree_steps(entry, self.backtrack(entry))
+            return self.backtrack(entry)
+        if algorithm == "kruskal":
+            # Loops come from the rejected walls, no break_walls pass
+            return kruskal(self.cells, self.width, self.height,
+                           self.pattern_mask(), perfect)
+        raise ValueError(f"Unknown algorithm '{algorithm}'")
+
+    def generate_maze_steps(
+        self,
+        entry: Tuple[int, int],
+        exit: Tuple[int, int],
+        perfect: bool,
+        algorithm: str = "backtracker",
+        record_tree: bool = False
+    ) -> Generator[List[List[int]], None, None]:
+        """
+        Generate a maze using the Recursive Backtracker algorithm
+        (or Kruskal).
+        With a generator to allow animation during rendering.
+        """
+        self.reset(entry, exit)
+        self.grid = self.rows()
+
+        for cell in self.carve(entry, perfect, algorithm, record_tree):
+            # Report the cell and its neighbors into the grid
+            y, x = divmod(cell, self.width)
+            self.grid[y][x] = self.cells[cell]
+            # Border walls are never open, the moves stay in the maze
+            for step, _, _ in self.moves[self.cells[cell]]:
+                y, x = divmod(cell + step, self.width)
+                self.grid[y][x] = self.cells[cell + step]
+            yield self.grid
 
         # If the maze must not be perfect we break some wall
-        if not perfect:
+        if not perfect and algorithm == "backtracker":
             self.imperfect()
 
     def generate_maze(self, entry: Tuple[int, int], exit: Tuple[int, int],
-                      perfect: bool) -> None:
-        # Algo Recursive Backtracker
-        # Add the starting point to the visited area
-        self.grid = []
-        for y in range(self.height):
-            new_line = []
-            for x in range(self.width):
-                new_line.append(15)
-            self.grid.append(new_line)
-
-        self.visited = []
-        for y in range(self.height):
-            line_visited = []
-            for x in range(self.width):
-                line_visited.append(False)
-            self.visited.append(line_visited)
-
-        self.path = []
-
-        self.draw42(entry, exit)
-        start_x, start_y = entry
-        self.visited[start_y][start_x] = True
-        self.path.append((start_x, start_y))
-
-        while len(self.path) > 0:
-            # Get the current pos
-            # [-1] is the lastpositional arg
-            curr_x, curr_y = self.path[-1]
-
-            # Check that we did'nt visited the neighbors already
-            possibles = self.neighbors(curr_x, curr_y)
-
-            # One possibilitie exist at least
-            if len(possibles) > 0:
-                next_x, next_y = random.choice(possibles)
+                      perfect: bool, algorithm: str = "backtracker",
+                      record_tree: bool = False) -> None:
+        # Algo Recursive Backtracker (or Kruskal)
+        # record_tree keeps the spanning tree to solve without a BFS
+        self.reset(entry, exit)
 
-                self.dig_path(curr_x, curr_y, next_x, next_y)
-
-                # Next is now visited
-                self.visited[next_y][next_x] = True
-
-                # Add next to the path
-                self.path.append((next_x, next_y))
-            else:
-                # No possibilities we go back
-                # As the current is visited the loop will choose another poss
-                self.path.pop()
+        # Run the algorithm to the end
+        deque(self.carve(entry, perfect, algorithm, record_tree), maxlen=0)
 
         # If the maze must not be perfect we break some wall
-        if not perfect:
-            self.imperfect()
+        if not perfect and algorithm == "backtracker":
+            self.break_walls()
 
-    def path_to_cardinal(self, path: List[Tuple[int, int]]) -> str:
+        # The grid is only built if someone asks for it
+        self._grid = None
+
+    def path_to_cardinal(self, path: Solution) -> str:
         """
         Convert a list of coordinates into a cardinal direction string
         (N, S, E, W).
         """
+        if isinstance(path, MazePath):
+            return path.cardinal()
         if not path or len(path) < 2:
             return ""
 
@@ -231,28 +450,43 @@ class MazeGenerator:
                 directions += "W"
         return directions
 
-    def save_maze(self, filename: str, path: List[Tuple[int, int]],
-                  entry: Tuple[int, int], exit: Tuple[int, int]) -> None:
+    def to_text(self, path: Solution, entry: Tuple[int, int],
+                exit: Tuple[int, int]) -> str:
+        """
+        The maze grid and solution in the output file format.
+        """
+        lines: List[str] = []
+        if self._grid is None:
+            # Straight from the cells, without building the grid
+            cells = self.cells
+            for i in range(0, self.width * self.height, self.width):
+                lines.append(cells[i:i + self.width].translate(HEX_DIGITS)
+                             .decode())
+        else:
+            for row in self._grid:
+                # Convert to hexadecimal (:X)
+                lines.append("".join([f"{cell:X}" for cell in row]))
+
+        path_str = self.path_to_cardinal(path)
+
+        lines.append("")
+        lines.append(f"{entry[0]},{entry[1]}")
+        lines.append(f"{exit[0]},{exit[1]}")
+        lines.append(path_str)
+        return "\n".join(lines) + "\n"
+
+    def save_maze(self, filename: str, path: Solution,
+                  entry: Tuple[int, int], exit: Tuple[int, int],
+                  index: bool = False) -> None:
         """
         Save the maze grid and solution to a text file.
+        With index, a sidecar row index allows partial reads (load_region).
         """
         try:
             with open(filename, "w") as f:
-                for row in self.grid:
-                    line_text = ""
-                    for cell in row:
-                        # Convert to hexadecimal (:X)
-                        hexa_char = f"{cell:X}"
-
-                        line_text = line_text + hexa_char
-
-                    # Line finished we add it and pass to the next row
-                    f.write(line_text + "\n")
-                path_str = self.path_to_cardinal(path)
-
-                f.write(f"\n{entry[0]},{entry[1]}\n")
-                f.write(f"{exit[0]},{exit[1]}\n")
-                f.write(path_str + "\n")
+                f.write(self.to_text(path, entry, exit))
+            if index:
+                write_index(filename, self.width, self.height)
         except Exception as e:
             print(f"Writing error : {e}")
 
@@ -304,26 +538,54 @@ class MazeGenerator:
 
         for wx, wy in walls:
             # Put a block at coordinates
-            self.grid[wy][wx] = 15
+            cell = wy * self.width + wx
+            self.cells[cell] = 15
+
+            self.visited[(wy + 1) * (self.width + 2) + wx + 1] = 1
 
-            self.visited[wy][wx] = True
+    def pattern_mask(self, left: int = 0, top: int = 0,
+                     width: Optional[int] = None,
+                     height: Optional[int] = None) -> bytearray:
+        """
+        Flat buffer with 1 on the cells of the 42 pattern, for the whole
+        maze or for the rectangle at (left, top).
+        """
+        if width is None:
+            width = self.width
+        if height is None:
+            height = self.height
+        blocked = bytearray(width * height)
+        for x, y in self.pattern:
+            if left <= x < left + width and top <= y < top + height:
+                blocked[(y - top) * width + x - left] = 1
+        return blocked
 
     def imperfect(self) -> None:
         """Randomly remove internal walls to create loops in the maze."""
+        self.break_walls()
+
+    def break_walls(self) -> None:
+        """Randomly remove internal walls of the flat cell buffer."""
 
         # Arbitrary limit to wall breaking
         if self.width <= 2 or self.height <= 2:
             print("Maze too small to be imperfect")
             return
+        # The grid is rebuilt from the cells on its next use
+        self.sync_cells()
         limit = (self.width * self.height) // 20
         count = 0
         max_attempts = limit * 10
         attempts = 0
 
-        east_wall = 2
-        south_wall = 4
-        west_wall = 8
-        north_wall = 1
+        cells = self.cells
+        blocked = self.pattern_mask()
+        # Loops make the tree path no longer the shortest
+        self.forget_tree()
+
+        # Moves of a cell without any wall: North, South, East, West
+        east_move = self.moves[0][2]
+        south_move = self.moves[0][1]
 
         while count < limit and attempts < max_attempts:
             attempts += 1
@@ -331,26 +593,235 @@ class MazeGenerator:
             random_y = random.randint(1, self.height - 2)
             choice = random.randint(0, 1)
 
-            # Break east wall
+            # Break east wall or south wall
             if choice == 0:
-                if ((random_x, random_y) not in self.pattern and
-                        (random_x + 1, random_y) not in self.pattern):
+                step, wall, back = east_move
+            else:
+                step, wall, back = south_move
 
-                    # Check this wall exist
-                    if self.have_wall(random_x, random_y, east_wall):
-                        self.grid[random_y][random_x] &= ~east_wall
-                        self.grid[random_y][random_x + 1] &= ~west_wall
-                        count += 1
+            cell = random_y * self.width + random_x
+            if not blocked[cell] and not blocked[cell + step]:
 
-            # Break south wall
-            else:
-                if ((random_x, random_y) not in self.pattern and
-                        (random_x, random_y + 1) not in self.pattern):
+                # Check this wall exist
+                if cells[cell] & wall:
+                    cells[cell] &= ~wall
+                    cells[cell + step] &= ~back
+                    count += 1
 
-                    if self.have_wall(random_x, random_y, south_wall):
-                        self.grid[random_y][random_x] &= ~south_wall
-                        self.grid[random_y + 1][random_x] &= ~north_wall
-                        count += 1
+    def regenerate_region(self, x: int, y: int, width: int, height: int,
+                          perfect: bool = True, openings: int = 0) -> None:
+        """
+        Re-carve the walls inside a rectangle with the backtracker.
+        The rectangle gets one new random tree, one per part if the 42
+        pattern splits it. The pattern is left untouched.
+        With perfect=True, exactly one boundary wall is then opened
+        towards each part of the maze around the rectangle, so a perfect
+        maze stays perfect. Those parts are found by searching from the
+        old openings until the ones that lead to the same part have met,
+        for at most SEARCH_FACTOR cells per cell of the rectangle. If the
+        search is cut short, only the old parts of the rectangle it
+        joined are carved together: each tree keeps one opening per part
+        it is known to reach.
+        With perfect=False, the old openings are kept and `openings` more
+        boundary walls are broken. Only the rectangle and the cells
+        around it are read.
+        Raises ValueError if the rectangle is outside the maze, or if
+        openings are asked for a perfect region.
+        """
+        if (x < 0 or y < 0 or width <= 0 or height <= 0
+                or x + width > self.width or y + height > self.height):
+            raise ValueError(f"Region {width}x{height} at {x},{y} is outside "
+                             f"the {self.width}x{self.height} maze")
+        if perfect and openings > 0:
+            raise ValueError("Extra openings make loops, "
+                             "they need perfect=False")
+
+        cells = self.cells
+        # A built grid is the reference, copy the rectangle and its frame
+        left = max(x - 1, 0)
+        right = min(x + width + 1, self.width)
+        top = max(y - 1, 0)
+        bottom = min(y + height + 1, self.height)
+        rows = self._grid
+        if rows is not None:
+            for row in range(top, bottom):
+                start = row * self.width
+                cells[start + left:start + right] = \
+                    bytes(rows[row][left:right])
+
+        # Old walls of the rectangle, its edges are borders in there
+        old = bytearray()
+        for row in range(y, y + height):
+            start = row * self.width + x
+            old += cells[start:start + width]
+        moves = build_moves(width)
+        borders = build_borders(width, height)
+        blocked = self.pattern_mask(x, y, width, height)
+        area = width * height
+
+        # Walls between the rectangle and the rest of the maze:
+        # (cell in the rectangle, cell in the maze, neighbor outside,
+        # wall, wall of the neighbor)
+        walls: List[Tuple[int, int, int, int, int]] = []
+        for cell in range(area):
+            edges = borders[cell]
+            if not edges or blocked[cell]:
+                continue
+            row, col = divmod(cell, width)
+            inside = (y + row) * self.width + x + col
+            sides = self.border(x + col, y + row)
+            for step, wall, back in self.moves[sides]:
+                other = inside + step
+                if (edges & wall and (other % self.width,
+                                      other // self.width)
+                        not in self.pattern):
+                    walls.append((cell, inside, other, wall, back))
+
+        # Parts of the rectangle connected through the old walls
+        old_parts = connected_parts(closed_sides(old, borders), blocked,
+                                    moves)
+        if perfect:
+            # In a perfect maze the old parts and the parts outside make
+            # one tree over the old openings: that many groups are left
+            # when the search has found all of them
+            opened = [index for index, wall in enumerate(walls)
+                      if not old[wall[0]] & wall[3]]
+            groups = self.outside_groups(x, y, width, height, walls,
+                                         len(opened) - len(old_parts) + 1,
+                                         SEARCH_FACTOR * area)
+            # Old parts joined by an outside group they both open on
+            parent = array("I", groups)
+            parent.extend(range(len(walls), len(walls) + len(old_parts)))
+            number = part_numbers(old_parts, area)
+            for index in opened:
+                root = find(parent, index)
+                inner = find(parent, len(walls) + number[walls[index][0]] - 1)
+                if root != inner:
+                    parent[root] = inner
+            joined = array("I", [0]) * area
+            for cell in range(area):
+                if not blocked[cell]:
+                    joined[cell] = find(parent,
+                                        len(walls) + number[cell] - 1)
+            # Joined cells are carved together
+            apart = bytearray(borders)
+            for cell in range(area):
+                for step, wall, _ in moves[borders[cell]]:
+                    if joined[cell + step] != joined[cell]:
+                        apart[cell] |= wall
+            parts = connected_parts(apart, blocked, moves)
+        else:
+            parts = connected_parts(borders, blocked, moves)
+
+        # A maze of the rectangle's size where only the part being
+        # carved is not visited yet
+        region = MazeGenerator(width, height)
+        region.visited = bytearray(b"\x01") * len(region.visited)
+        stride = width + 2
+        for part in parts:
+            for cell in part:
+                region.visited[(cell // width + 1) * stride
+                               + cell % width + 1] = 0
+            first = part[0]
+            deque(region.backtrack((first % width, first // width)),
+                  maxlen=0)
+
+        # New walls inside, old walls on the edges
+        for row in range(height):
+            start = (y + row) * self.width + x
+            for col in range(width):
+                cell = row * width + col
+                edges = borders[cell]
+                cells[start + col] = ((region.cells[cell] & ~edges)
+                                      | (old[cell] & edges))
+
+        if perfect:
+            # Kruskal over the boundary walls that stay between joined
+            # cells and their groups: outside groups first, then parts
+            label = part_numbers(parts, area)
+            tree = array("I", groups)
+            tree.extend(range(len(walls), len(walls) + len(parts)))
+            order = list(range(len(walls)))
+            random.shuffle(order)
+            for index in order:
+                cell, inside, other, wall, back = walls[index]
+                if find(parent, index) != joined[cell]:
+                    continue
+                root = find(tree, index)
+                inner = find(tree, len(walls) + label[cell] - 1)
+                if root != inner:
+                    tree[root] = inner
+                    cells[inside] &= ~wall
+                    cells[other] &= ~back
+                else:
+                    cells[inside] |= wall
+                    cells[other] |= back
+        elif openings > 0:
+            closed = [wall for wall in walls if cells[wall[1]] & wall[3]]
+            for _, inside, other, wall, back in random.sample(
+                    closed, min(openings, len(closed))):
+                cells[inside] &= ~wall
+                cells[other] &= ~back
+
+        if rows is not None:
+            for row in range(top, bottom):
+                start = row * self.width
+                rows[row][left:right] = list(cells[start + left:
+                                                   start + right])
+        self.forget_tree()
+
+    def outside_groups(self, x: int, y: int, width: int, height: int,
+                       walls: List[Tuple[int, int, int, int, int]],
+                       target: int, limit: int) -> "array[int]":
+        """
+        Group the boundary walls of a rectangle by the part of the maze
+        outside it that their outer cell belongs to, searching from all
+        of them at once until only `target` groups are left, or until
+        `limit` cells have been reached: walls of the same part may then
+        be left in different groups.
+        Returns the index of a wall of the group of each wall.
+        """
+        rows = self._grid
+        cells = self.cells
+        parent = array("I", range(len(walls)))
+        groups = len(walls)
+        # Wall whose search reached each cell, -1 inside the rectangle
+        owner: Dict[int, int] = {}
+        for row in range(y, y + height):
+            start = row * self.width + x
+            owner.update(dict.fromkeys(range(start, start + width), -1))
+        queue: List[int] = []
+        for index, wall in enumerate(walls):
+            owner[wall[2]] = index
+            queue.append(wall[2])
+
+        last_x = self.width - 1
+        last_y = self.height - 1
+        for curr in queue:
+            if groups <= target:
+                break
+            if len(queue) > limit:
+                break
+            cy, cx = divmod(curr, self.width)
+            closed = rows[cy][cx] if rows is not None else cells[curr]
+            if cx == 0 or cy == 0 or cx == last_x or cy == last_y:
+                closed |= self.border(cx, cy)
+            root = find(parent, owner[curr])
+            for step, _, _ in self.moves[closed]:
+                nxt = curr + step
+                reached = owner.get(nxt)
+                if reached is None:
+                    owner[nxt] = root
+                    queue.append(nxt)
+                elif reached >= 0:
+                    other = find(parent, reached)
+                    if other != root:
+                        parent[other] = root
+                        groups -= 1
+
+        for index in range(len(walls)):
+            parent[index] = find(parent, index)
+        return parent
 
     def get_neighbors(self, x: int, y: int) -> List[Tuple[int, int]]:
         """
@@ -359,86 +830,138 @@ class MazeGenerator:
         """
         possible: List[Tuple[int, int]] = []
 
-        value = self.grid[y][x]
-
-        # North
-        if y > 0 and (value & 1) == 0:
-            possible.append((x, y - 1))
-
-        # South
-        if y < self.height - 1 and (value & 4) == 0:
-            possible.append((x, y + 1))
-
-        # East
-        if x < self.width - 1 and (value & 2) == 0:
-            possible.append((x + 1, y))
-
-        # West
-        if x > 0 and (value & 8) == 0:
-            possible.append((x - 1, y))
-
+        cell = y * self.width + x
+        for step, _, _ in self.moves[self.grid[y][x] | self.border(x, y)]:
+            possible.append(((cell + step) % self.width,
+                             (cell + step) // self.width))
         return possible
 
-    def solve_maze(self, start: Tuple[int, int],
-                   end: Tuple[int, int]) -> List[Tuple[int, int]]:
+    def closed_cells(self) -> Cells:
+        """Flat copy of the grid with the borders closed like walls."""
+        return closed_sides(self.flat_cells(),
+                            build_borders(self.width, self.height))
+
+    def tree_path(self, start: Tuple[int, int],
+                  end: Tuple[int, int]) -> MazePath:
         """
-        Find the shortest path using Breadth-First Search (BFS).
+        Path between two cells of the recorded spanning tree, through
+        their lowest common ancestor, in O(path length).
+        Returns an empty MazePath if a cell is not in the tree.
         """
-
-        map: List[List[int]] = []
-        for y in range(self.height):
-            line: List[int] = []
-            for x in range(self.width):
-                line.append(-1)
-            map.append(line)
-
-        start_x, start_y = start
-        map[start_y][start_x] = 0
-        queue = [start]
+        tree = self.tree
+        depth = self.depth
+        if not tree:
+            return MazePath()
+        steps = (-self.width, 1, self.width, -1)
+
+        a = start[1] * self.width + start[0]
+        b = end[1] * self.width + end[0]
+        if tree[a] == NO_PARENT or tree[b] == NO_PARENT:
+            return MazePath()
+
+        # Climbing from the start goes against the parent moves,
+        # the moves climbed from the end are replayed in reverse
+        up = bytearray()
+        down = bytearray()
+        while depth[a] > depth[b]:
+            code = tree[a]
+            up.append(code ^ 2)
+            a -= steps[code]
+        while depth[b] > depth[a]:
+            code = tree[b]
+            down.append(code)
+            b -= steps[code]
+        while a != b:
+            code = tree[a]
+            up.append(code ^ 2)
+            a -= steps[code]
+            code = tree[b]
+            down.append(code)
+            b -= steps[code]
+
+        down.reverse()
+        return MazePath.from_codes(start, up + down)
+
+    def solve_path(self, start: Tuple[int, int],
+                   end: Tuple[int, int]) -> MazePath:
+        """
+        Breadth-First Search on a flat copy of the grid.
+        Returns an empty MazePath if the end can't be reached.
+        A recorded spanning tree gives the path without any search.
+        """
+        if self.tree:
+            path = self.tree_path(start, end)
+            if path:
+                return path
+
+        size = self.width * self.height
+        closed = self.closed_cells()
+        moves = self.moves
+
+        first = start[1] * self.width + start[0]
+        last = end[1] * self.width + end[0]
+
+        # -1 == not visited
+        dist = array("i", [-1]) * size
+        queue = array("I", [0]) * size
+        dist[first] = 0
+        queue[0] = first
+        head = 0
+        tail = 1
         resolved = False
 
-        while len(queue) > 0:
-
-            cx, cy = queue.pop(0)
+        while head < tail:
+            cell = queue[head]
+            head += 1
 
-            if (cx, cy) == end:
+            if cell == last:
                 resolved = True
                 break
 
-            neighbors = self.get_neighbors(cx, cy)
-            for x, y in neighbors:
-                # -1 == not visited
-                if map[y][x] == -1:
-                    map[y][x] = map[cy][cx] + 1
-                    queue.append((x, y))
-        if not resolved:
-            print("No solution found")
-            return []
-
-        # We found the exit, now we need to find the shortest path
+            d = dist[cell] + 1
+            for step, _, _ in moves[closed[cell]]:
+                if dist[cell + step] == -1:
+                    dist[cell + step] = d
+                    queue[tail] = cell + step
+                    tail += 1
 
-        # Start from the end
-        path = [end]
-        cx, cy = end
-
-        dist = map[cy][cx]
-
-        while dist > 0:
-            neighbors = self.get_neighbors(cx, cy)
-            found = False
-            for x, y in neighbors:
-                if map[y][x] == dist - 1:
-                    cx, cy = x, y
-                    dist -= 1
-                    path.append((x, y))
-                    found = True
+        if not resolved:
+            return MazePath()
+
+        # We found the exit, now we walk back to the start
+        # following decreasing distances, and store each move
+        # backward from the end of the buffer
+        cell = last
+        d = dist[last]
+        codes = bytearray(d)
+        while d > 0:
+            d -= 1
+            for step, _, back in moves[closed[cell]]:
+                if dist[cell + step] == d:
+                    cell += step
+                    # The move came in through the back wall
+                    codes[d] = WALL_CODES[back]
                     break
 
-            if not found:
-                break
+        return MazePath.from_codes(start, codes)
 
-        # We inverse the path
-        return path[::-1]
+    def shortest_path(self, start: Tuple[int, int],
+                      end: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """
+        Breadth-First Search on a flat copy of the grid.
+        Returns an empty list if the end can't be reached.
+        """
+        return list(self.solve_path(start, end))
+
+    def solve_maze(self, start: Tuple[int, int],
+                   end: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """
+        Find the shortest path using Breadth-First Search (BFS).
+        """
+        path = self.shortest_path(start, end)
+        if not path:
+            print("No solution found")
+        return path
 
     def solve_maze_steps(self, start: Tuple[int, int],
                          end: Tuple[int, int]
@@ -446,61 +969,10 @@ class MazeGenerator:
         """
         Find the shortest path using Breadth-First Search (BFS).
         """
-
-        map: List[List[int]] = []
-        for y in range(self.height):
-            line: List[int] = []
-            for x in range(self.width):
-                line.append(-1)
-            map.append(line)
-
-        start_x, start_y = start
-        map[start_y][start_x] = 0
-        queue = [start]
-        resolved = False
-
-        while len(queue) > 0:
-
-            cx, cy = queue.pop(0)
-
-            if (cx, cy) == end:
-                resolved = True
-                break
-
-            neighbors = self.get_neighbors(cx, cy)
-            for x, y in neighbors:
-                # -1 == not visited
-                if map[y][x] == -1:
-                    map[y][x] = map[cy][cx] + 1
-                    queue.append((x, y))
-        if not resolved:
+        final_path = self.shortest_path(start, end)
+        if not final_path:
             print("No solution found")
             return
 
-        # We found the exit, now we need to find the shortest path
-
-        # Start from the end
-        path = [end]
-        cx, cy = end
-
-        dist = map[cy][cx]
-
-        while dist > 0:
-            neighbors = self.get_neighbors(cx, cy)
-            found = False
-            for x, y in neighbors:
-                if map[y][x] == dist - 1:
-                    cx, cy = x, y
-                    dist -= 1
-                    path.append((x, y))
-                    found = True
-                    break
-
-            if not found:
-                break
-
-        # We inverse the path
-        final_path = path[::-1]
-
         for i in range(1, len(final_path) + 1):
             yield final_path[:i]
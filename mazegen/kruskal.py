@@ -0,0 +1,91 @@
+import random
+from array import array
+from typing import Generator
+
+# Fraction of the rejected walls broken anyway for imperfect mazes,
+# about as many loops as MazeGenerator.break_walls adds
+LOOP_FRACTION = 0.05
+
+
+def find(parent: "array[int]", cell: int) -> int:
+    """Root of the set of a cell, with path compression."""
+    root = cell
+    while parent[root] != root:
+        root = parent[root]
+
+    # Every cell on the way now points to the root
+    while parent[cell] != root:
+        parent[cell], cell = root, parent[cell]
+    return root
+
+
+def internal_walls(width: int, height: int) -> "array[int]":
+    """
+    Pack every internal wall in one integer:
+    cell * 2 for its east wall, cell * 2 + 1 for its south wall.
+    """
+    walls = array("I")
+    for y in range(height):
+        row = y * width
+        # East walls, not on the last column
+        walls.extend(range(row * 2, (row + width - 1) * 2, 2))
+        # South walls, not on the last row
+        if y < height - 1:
+            walls.extend(range(row * 2 + 1, (row + width) * 2, 2))
+    return walls
+
+
+def kruskal(cells: bytearray, width: int, height: int, blocked: bytearray,
+            perfect: bool,
+            loop_fraction: float = LOOP_FRACTION
+            ) -> Generator[int, None, None]:
+    """
+    Randomized Kruskal on the flat cell buffer.
+    Walls are visited in a random order and broken when they separate
+    two sets, blocked cells (the 42) are never touched.
+    For imperfect mazes a fraction of the other walls is broken too.
+    Yields the index of the cell whose east or south wall was broken.
+    """
+    size = width * height
+    walls = internal_walls(width, height)
+    random.shuffle(walls)
+
+    # Union-find: parent of each cell and upper bound of its tree height
+    parent = array("I", range(size))
+    rank = bytearray(size)
+
+    credit = 0.0
+    for wall in walls:
+        cell = wall >> 1
+        if wall & 1:
+            nxt = cell + width
+            here, there = 4, 1  # South wall, north wall of next
+        else:
+            nxt = cell + 1
+            here, there = 2, 8  # East wall, west wall of next
+
+        if blocked[cell] or blocked[nxt]:
+            continue
+
+        root = find(parent, cell)
+        other = find(parent, nxt)
+        if root == other:
+            # Already connected, breaking it makes a loop
+            if perfect:
+                continue
+            credit += loop_fraction
+            if credit < 1:
+                continue
+            credit -= 1
+        # Union by rank
+        elif rank[root] < rank[other]:
+            parent[root] = other
+        elif rank[root] > rank[other]:
+            parent[other] = root
+        else:
+            parent[other] = root
+            rank[root] += 1
+
+        cells[cell] &= ~here
+        cells[nxt] &= ~there
+        yield cell
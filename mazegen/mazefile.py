@@ -0,0 +1,187 @@
+import os
+import struct
+from typing import List, Tuple, Union
+
+from .path import MazePath
+
+# Magic, width, height, entry x, entry y, exit x, exit y
+BINARY_HEADER = struct.Struct("<4sIIIIII")
+BINARY_MAGIC = b"MZB1"
+
+# Magic, width, height, row stride, maze file size and mtime
+INDEX_HEADER = struct.Struct("<4sIIIQQ")
+INDEX_MAGIC = b"MZI1"
+
+# Value of each hex digit byte, 255 for any other byte
+HEX_VALUES = bytes(int(chr(b), 16) if chr(b) in "0123456789ABCDEFabcdef"
+                   else 255 for b in range(256))
+
+
+def load_maze(filename: str) -> Tuple[List[List[int]], Tuple[int, int],
+                                      Tuple[int, int], str]:
+    """
+    Read a maze written by MazeGenerator.save_maze.
+    Returns the grid, the entry, the exit and the cardinal solution.
+    Raises ValueError if the file is not a valid maze file.
+    """
+    grid: List[List[int]] = []
+
+    with open(filename, "r") as f:
+        lines = f.read().split("\n")
+
+    # Hex rows until the first empty line
+    i = 0
+    while i < len(lines) and lines[i] != "":
+        row: List[int] = []
+        for char in lines[i]:
+            row.append(int(char, 16))
+        if grid and len(row) != len(grid[0]):
+            raise ValueError(f"Row {i} has {len(row)} cells, "
+                             f"expected {len(grid[0])}")
+        grid.append(row)
+        i += 1
+
+    if not grid:
+        raise ValueError("No maze grid found")
+
+    # Skip the separator line
+    footer = lines[i + 1:]
+    if len(footer) < 2:
+        raise ValueError("Missing entry/exit coordinates")
+
+    entry = _parse_coord(footer[0])
+    exit = _parse_coord(footer[1])
+    path = footer[2] if len(footer) > 2 else ""
+
+    return grid, entry, exit, path
+
+
+def _parse_coord(text: str) -> Tuple[int, int]:
+    """Convert a 'x,y' string into a coordinate tuple."""
+    parts = text.split(",")
+    if len(parts) != 2:
+        raise ValueError(f"Invalid coordinate '{text}'")
+    return (int(parts[0]), int(parts[1]))
+
+
+def pack_maze(width: int, height: int, cells: Union[bytes, bytearray],
+              entry: Tuple[int, int], exit: Tuple[int, int],
+              path: MazePath) -> bytes:
+    """
+    Binary form of a maze: header, one byte per cell, packed path.
+    """
+    return (BINARY_HEADER.pack(BINARY_MAGIC, width, height,
+                               entry[0], entry[1], exit[0], exit[1])
+            + bytes(cells) + path.tobytes())
+
+
+def unpack_maze(raw: bytes) -> Tuple[List[List[int]], Tuple[int, int],
+                                     Tuple[int, int], MazePath]:
+    """
+    Read a maze written by pack_maze.
+    Raises ValueError if the data is not a valid binary maze.
+    """
+    if len(raw) < BINARY_HEADER.size:
+        raise ValueError("Truncated binary maze")
+    magic, width, height, entry_x, entry_y, exit_x, exit_y = \
+        BINARY_HEADER.unpack_from(raw, 0)
+    if magic != BINARY_MAGIC:
+        raise ValueError("Not a binary maze")
+
+    start = BINARY_HEADER.size
+    end = start + width * height
+    if len(raw) < end:
+        raise ValueError("Truncated binary maze")
+
+    grid = [list(raw[i:i + width]) for i in range(start, end, width)]
+    return grid, (entry_x, entry_y), (exit_x, exit_y), \
+        MazePath.frombytes(raw[end:])
+
+
+def index_name(filename: str) -> str:
+    """Name of the sidecar row index of a maze file."""
+    return filename + ".idx"
+
+
+def scan_rows(filename: str) -> Tuple[int, int, int]:
+    """
+    Read the hex rows of a maze file one at a time.
+    Returns the width, the height and the row stride in bytes.
+    Raises ValueError if the rows don't all have the same size.
+    """
+    width = 0
+    height = 0
+    stride = 0
+    with open(filename, "rb") as f:
+        for line in f:
+            row = line.rstrip(b"\r\n")
+            if not row:
+                break
+            if height == 0:
+                width = len(row)
+                stride = len(line)
+            elif len(line) != stride:
+                raise ValueError(f"Row {height} has {len(row)} cells, "
+                                 f"expected {width}")
+            height += 1
+    if height == 0:
+        raise ValueError("No maze grid found")
+    return width, height, stride
+
+
+def write_index(filename: str, width: int, height: int) -> None:
+    """
+    Write the sidecar index of a maze file with fixed-width rows.
+    The index is tied to the size and mtime of the file.
+    """
+    with open(filename, "rb") as f:
+        line = f.readline()
+    info = os.stat(filename)
+    with open(index_name(filename), "wb") as f:
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, width, height, len(line),
+                                  info.st_size, info.st_mtime_ns))
+
+
+def read_index(filename: str) -> Tuple[int, int, int]:
+    """
+    Width, height and row stride of a maze file, from its sidecar index.
+    Without an up-to-date index the rows are scanned instead.
+    """
+    try:
+        with open(index_name(filename), "rb") as f:
+            raw = f.read(INDEX_HEADER.size)
+    except FileNotFoundError:
+        return scan_rows(filename)
+
+    if len(raw) == INDEX_HEADER.size:
+        magic, width, height, stride, size, mtime = INDEX_HEADER.unpack(raw)
+        info = os.stat(filename)
+        if (magic == INDEX_MAGIC and size == info.st_size
+                and mtime == info.st_mtime_ns):
+            return width, height, stride
+    # Stale or broken index
+    return scan_rows(filename)
+
+
+def load_region(filename: str, x: int, y: int,
+                width: int, height: int) -> List[List[int]]:
+    """
+    Read the sub-grid of a maze file at (x, y), seeking to each row and
+    reading only its cells.
+    Raises ValueError if the region is outside the maze.
+    """
+    maze_width, maze_height, stride = read_index(filename)
+    if (x < 0 or y < 0 or width <= 0 or height <= 0
+            or x + width > maze_width or y + height > maze_height):
+        raise ValueError(f"Region {width}x{height} at {x},{y} is outside "
+                         f"the {maze_width}x{maze_height} maze")
+
+    grid: List[List[int]] = []
+    with open(filename, "rb") as f:
+        for row_y in range(y, y + height):
+            f.seek(row_y * stride + x)
+            row = f.read(width).translate(HEX_VALUES)
+            if len(row) != width or 255 in row:
+                raise ValueError(f"Row {row_y} is not a row of hex cells")
+            grid.append(list(row))
+    return grid
@@ -0,0 +1,137 @@
+import struct
+from typing import Generator, List, Optional, Tuple, Union
+
+# Move codes are the index of their letter
+CARDINALS = "NESW"
+
+# Start x, start y, number of moves
+HEADER = struct.Struct("<III")
+
+# Cardinal letters of the 4 moves packed in each possible byte
+_LETTERS = ["".join(CARDINALS[(byte >> shift) & 3]
+                    for shift in (0, 2, 4, 6))
+            for byte in range(256)]
+
+
+class MazePath:
+    """
+    Path stored as its start cell and 2-bit moves, 4 moves per byte.
+    An empty path (no start) means there is no solution.
+    """
+    def __init__(self, start: Optional[Tuple[int, int]] = None,
+                 data: Optional[bytearray] = None, count: int = 0) -> None:
+        """Create a path from its start and its packed moves."""
+        self.start = start
+        self.data = data if data is not None else bytearray()
+        self.count = count
+
+    @classmethod
+    def from_codes(cls, start: Tuple[int, int],
+                   codes: Union[bytes, bytearray]) -> "MazePath":
+        """Pack a buffer of one move code (0-3) per byte."""
+        data = bytearray((len(codes) + 3) >> 2)
+        for i in range(len(codes)):
+            data[i >> 2] |= codes[i] << ((i & 3) << 1)
+        return cls(start, data, len(codes))
+
+    @classmethod
+    def from_coords(cls, path: List[Tuple[int, int]]) -> "MazePath":
+        """Encode a list of adjacent coordinates."""
+        if not path:
+            return cls()
+        codes = bytearray(len(path) - 1)
+        for i in range(len(path) - 1):
+            curr_x, curr_y = path[i]
+            next_x, next_y = path[i + 1]
+            if next_y < curr_y:
+                codes[i] = 0
+            elif next_x > curr_x:
+                codes[i] = 1
+            elif next_y > curr_y:
+                codes[i] = 2
+            else:
+                codes[i] = 3
+        return cls.from_codes(path[0], codes)
+
+    def __len__(self) -> int:
+        """Number of cells, like the list of coordinates."""
+        if self.start is None:
+            return 0
+        return self.count + 1
+
+    def __iter__(self) -> Generator[Tuple[int, int], None, None]:
+        """Decode the coordinates one at a time."""
+        if self.start is None:
+            return
+        x, y = self.start
+        yield x, y
+        for i in range(self.count):
+            code = (self.data[i >> 2] >> ((i & 3) << 1)) & 3
+            if code == 0:
+                y -= 1
+            elif code == 1:
+                x += 1
+            elif code == 2:
+                y += 1
+            else:
+                x -= 1
+            yield x, y
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, MazePath):
+            return NotImplemented
+        return (self.start == other.start and self.count == other.count
+                and self.data == other.data)
+
+    def __repr__(self) -> str:
+        return f"MazePath(start={self.start}, moves='{self.cardinal()}')"
+
+    def cardinal(self) -> str:
+        """The moves as a N, E, S, W string."""
+        return "".join([_LETTERS[byte] for byte in self.data])[:self.count]
+
+    def bitmap(self, width: int, height: int) -> bytearray:
+        """One bit per cell of the maze, set for the cells of the path."""
+        bits = bytearray((width * height + 7) >> 3)
+        if self.start is None:
+            return bits
+        steps = (-width, 1, width, -1)
+        cell = self.start[1] * width + self.start[0]
+        bits[cell >> 3] |= 1 << (cell & 7)
+        for i in range(self.count):
+            cell += steps[(self.data[i >> 2] >> ((i & 3) << 1)) & 3]
+            bits[cell >> 3] |= 1 << (cell & 7)
+        return bits
+
+    def tobytes(self) -> bytes:
+        """Serialize the path, see frombytes."""
+        if self.start is None:
+            return b""
+        return HEADER.pack(self.start[0], self.start[1],
+                           self.count) + bytes(self.data)
+
+    @classmethod
+    def frombytes(cls, raw: bytes) -> "MazePath":
+        """Deserialize a path written by tobytes."""
+        if not raw:
+            return cls()
+        x, y, count = HEADER.unpack_from(raw, 0)
+        data = bytearray(raw[HEADER.size:])
+        if len(data) != (count + 3) >> 2:
+            raise ValueError("Broken path data")
+        return cls((x, y), data, count)
+
+
+# Every way a solution is passed around
+Solution = Union[List[Tuple[int, int]], MazePath]
+
+
+def path_bitmap(path: Solution, width: int, height: int) -> bytearray:
+    """One bit per cell of the maze, set for the cells of any path."""
+    if isinstance(path, MazePath):
+        return path.bitmap(width, height)
+    bits = bytearray((width * height + 7) >> 3)
+    for x, y in path:
+        cell = y * width + x
+        bits[cell >> 3] |= 1 << (cell & 7)
+    return bits
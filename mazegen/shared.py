@@ -0,0 +1,132 @@
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, List, Optional, Tuple, cast
+
+from .generator import MazeGenerator, Cells, build_moves
+from .path import MazePath
+
+# Width and height, before the cells
+HEADER = struct.Struct("<II")
+
+
+def publish_maze(maze: MazeGenerator) -> SharedMemory:
+    """
+    Copy the grid of a maze in a new shared memory block, one byte per
+    cell with the borders closed like walls.
+    The caller must close() and unlink() the block when done.
+    """
+    closed = maze.closed_cells()
+    shm = SharedMemory(create=True, size=HEADER.size + len(closed))
+    buf = cast(memoryview, shm.buf)
+    HEADER.pack_into(buf, 0, maze.width, maze.height)
+    buf[HEADER.size:HEADER.size + len(closed)] = closed
+    return shm
+
+
+class SharedMazeView(MazeGenerator):
+    """
+    Read-only MazeGenerator attached by name to a published maze.
+    Grid rows and cells are views on the shared block, nothing is copied.
+    Every method that writes the maze raises TypeError.
+    """
+    def __init__(self, name: str) -> None:
+        """
+        Attach to the shared block. No cell is copied, but one row view
+        is built per grid row, so attaching is O(height).
+        """
+        # Empty generation buffers, the view can't dig
+        super().__init__(0, 0)
+        self.shm = SharedMemory(name=name)
+        buf = cast(memoryview, self.shm.buf)
+        width, height = HEADER.unpack_from(buf, 0)
+        self.width = width
+        self.height = height
+        size = width * height
+
+        self.shared = buf[HEADER.size:HEADER.size + size].toreadonly()
+        self.moves = build_moves(width)
+
+        # Rows are read-only memoryviews, indexed like lists
+        rows: List[Any] = [self.shared[i:i + width]
+                           for i in range(0, size, width)]
+        self.grid = cast(List[List[int]], rows)
+
+    def closed_cells(self) -> Cells:
+        """The shared cells, borders included."""
+        return self.shared
+
+    def reset(self, entry: Tuple[int, int], exit: Tuple[int, int]) -> None:
+        """A shared maze can't be regenerated."""
+        raise TypeError("SharedMazeView is read-only")
+
+    def load_cells(self, cells: bytearray) -> None:
+        """A shared maze can't be replaced."""
+        raise TypeError("SharedMazeView is read-only")
+
+    def dig_path(self, current_x: int, current_y: int,
+                 next_x: int, next_y: int) -> None:
+        """A shared maze can't be modified."""
+        raise TypeError("SharedMazeView is read-only")
+
+    def imperfect(self) -> None:
+        """A shared maze can't be modified."""
+        raise TypeError("SharedMazeView is read-only")
+
+    def break_walls(self) -> None:
+        """A shared maze can't be modified."""
+        raise TypeError("SharedMazeView is read-only")
+
+    def regenerate_region(self, x: int, y: int, width: int, height: int,
+                          perfect: bool = True, openings: int = 0) -> None:
+        """A shared maze can't be modified."""
+        raise TypeError("SharedMazeView is read-only")
+
+    def close(self) -> None:
+        """Release every view, then detach from the shared block."""
+        for row in cast(List[Any], self.grid):
+            row.release()
+        self.grid = []
+        self.shared.release()
+        self.shm.close()
+
+    def __enter__(self) -> "SharedMazeView":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+# Maze attached once by each worker process
+_worker_maze: Optional[SharedMazeView] = None
+
+
+def _attach(name: str) -> None:
+    """Worker initializer: attach to the published maze."""
+    global _worker_maze
+    _worker_maze = SharedMazeView(name)
+
+
+def _solve(pair: Tuple[Tuple[int, int], Tuple[int, int]]) -> MazePath:
+    """Solve one (start, end) pair on the worker maze."""
+    if _worker_maze is None:
+        raise RuntimeError("Worker is not attached to a maze")
+    return _worker_maze.solve_path(pair[0], pair[1])
+
+
+def solve_pairs(maze: MazeGenerator,
+                pairs: List[Tuple[Tuple[int, int], Tuple[int, int]]],
+                workers: Optional[int] = None) -> List[MazePath]:
+    """
+    Find the shortest path of every (start, end) pair across worker
+    processes sharing a single copy of the grid.
+    Paths come back packed, 2 bits per move.
+    """
+    shm = publish_maze(maze)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                 initargs=(shm.name,)) as pool:
+            return list(pool.map(_solve, pairs, chunksize=16))
+    finally:
+        shm.close()
+        shm.unlink()